@@ -4,3 +4,12 @@ Pytest configuration file for Django tests.
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache so cached responses never leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class FlexiblePageNumberPagination(PageNumberPagination):
@@ -10,3 +18,160 @@ class FlexiblePageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 10000
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a descending (created_at, id) ordering.
+
+    Each page is fetched with a WHERE on the last seen key instead of an OFFSET,
+    and no COUNT(*) is issued, so deep pages cost the same as the first one.
+    Cursors are opaque base64 tokens returned in the 'next'/'previous' links.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 10000
+    cursor_query_param = "cursor"
+    timestamp_field = "created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view=view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate the merged (created_at, id) order of several querysets, e.g. a table
+        and its archive. Ids must be unique across them. Each page costs one query
+        per queryset.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        position, reverse = self.decode_cursor(request)
+        ordering = (self.timestamp_field, "id") if reverse else (f"-{self.timestamp_field}", "-id")
+        rows = []
+        for queryset in querysets:
+            queryset = queryset.order_by(*ordering)
+            if position is not None:
+                queryset = queryset.filter(self.get_position_filter(position, reverse))
+            rows.extend(queryset[: self.page_size + 1])
+        if len(querysets) > 1:
+            rows = sorted(rows, key=self.get_key, reverse=not reverse)[: self.page_size + 1]
+
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Coming from a cursor means there is data on the side we came from.
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.first_key = self.get_key(rows[0]) if rows else None
+        self.last_key = self.get_key(rows[-1]) if rows else None
+        if not rows and position is not None:
+            # Keep the empty page navigable back to where it was requested from.
+            self.first_key = self.last_key = position
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_key(self, row):
+        if isinstance(row, dict):
+            return row[self.timestamp_field], row["id"]
+        return getattr(row, self.timestamp_field), row.pk
+
+    def get_position_filter(self, position, reverse):
+        timestamp, pk = position
+        if reverse:
+            return Q(**{f"{self.timestamp_field}__gt": timestamp}) | Q(**{self.timestamp_field: timestamp, "id__gt": pk})
+        return Q(**{f"{self.timestamp_field}__lt": timestamp}) | Q(**{self.timestamp_field: timestamp, "id__lt": pk})
+
+    def get_next_link(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.last_key, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.first_key, True))
+
+    def encode_cursor(self, key, reverse):
+        timestamp, pk = key
+        payload = {"t": timestamp.isoformat(), "i": pk}
+        if reverse:
+            payload["r"] = 1
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii"))
+            position = (datetime.fromisoformat(payload["t"]), int(payload["i"]))
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class OptInKeysetPaginationMixin:
+    """
+    ViewSet mixin that switches to KeysetPagination when a client asks for it
+    with ?pagination=cursor (or sends a cursor). Page-number paging stays the default.
+    Keyset pages are always ordered newest first; ?ordering= and search ranking
+    do not apply to them.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def uses_keyset_pagination(self):
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get("pagination") == "cursor" or KeysetPagination.cursor_query_param in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.uses_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
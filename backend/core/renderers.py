@@ -0,0 +1,39 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+def encode_ndjson_line(data):
+    """Encode one JSON document as a single NDJSON line (bytes, newline-terminated)."""
+    return json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def iter_ndjson(rows, batch_size=500):
+    """Encode an iterable of JSON-compatible rows as NDJSON, yielding a chunk every batch_size rows."""
+    batch = []
+    for row in rows:
+        batch.append(encode_ndjson_line(row))
+        if len(batch) >= batch_size:
+            yield b"".join(batch)
+            batch = []
+    if batch:
+        yield b"".join(batch)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders newline-delimited JSON (application/x-ndjson).
+    A list becomes one line per element; any other payload (e.g. an error) a single line.
+    Views that support it usually stream rows themselves with iter_ndjson().
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(encode_ndjson_line(row) for row in rows)
@@ -156,3 +156,37 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": False,
     "AUTH_HEADER_TYPES": ("Bearer",),  # Prefix
 }
+
+# --- Cache Settings ---
+# Local-memory cache by default. Point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. Redis or Memcached) when running several worker processes.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "made-default"),
+    }
+}
+
+# Seconds that public catalogue facet counts are cached for
+CATALOGUE_FACETS_CACHE_TIMEOUT = int(os.environ.get("CATALOGUE_FACETS_CACHE_TIMEOUT", "60"))
+
+# Seconds that public catalogue list/detail responses are cached for.
+# Entries are also invalidated whenever items, locations or boxes change.
+CATALOGUE_RESPONSE_CACHE_TIMEOUT = int(os.environ.get("CATALOGUE_RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Dashboard statistics: seconds cached figures are fresh, and how much longer
+# stale figures may be served while one request recomputes them
+DASHBOARD_STATS_FRESH_SECONDS = int(os.environ.get("DASHBOARD_STATS_FRESH_SECONDS", "30"))
+DASHBOARD_STATS_STALE_SECONDS = int(os.environ.get("DASHBOARD_STATS_STALE_SECONDS", "300"))
+
+# Seconds scan code resolutions live in the shared cache (they are also invalidated on every change)
+SCAN_CACHE_TIMEOUT = int(os.environ.get("SCAN_CACHE_TIMEOUT", "3600"))
+
+# Directory that background export jobs write their CSV files to
+EXPORT_ROOT = os.environ.get("EXPORT_ROOT", str(BASE_DIR / "exports"))
+
+# Seconds a finished export job is reused for identical export requests
+EXPORT_JOB_REUSE_SECONDS = int(os.environ.get("EXPORT_JOB_REUSE_SECONDS", "600"))
+
+# Seconds after which a RUNNING export job is treated as abandoned by its worker
+EXPORT_JOB_STALE_SECONDS = int(os.environ.get("EXPORT_JOB_STALE_SECONDS", "3600"))
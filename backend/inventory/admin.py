@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Location, Box, CollectionItem, ItemHistory
+from .models import Location, Box, CollectionItem, ExportJob, ItemHistory, ArchivedItemHistory
 
 
 @admin.register(Location)
@@ -69,6 +69,9 @@ class ItemHistoryAdmin(admin.ModelAdmin):
         "created_at",
     ]
     list_filter = ["event_type", "created_at"]
+    # __str__ and the list columns read these relations for every row.
+    list_select_related = ["item", "from_location", "to_location", "acted_by"]
+    raw_id_fields = ["item", "movement_request"]
     search_fields = ["item__item_code", "item__title", "notes"]
     readonly_fields = ["created_at"]
 
@@ -78,3 +81,28 @@ class ItemHistoryAdmin(admin.ModelAdmin):
         ("Details", {"fields": ("movement_request", "acted_by", "notes")}),
         ("Timestamp", {"fields": ("created_at",)}),
     )
+
+
+@admin.register(ArchivedItemHistory)
+class ArchivedItemHistoryAdmin(admin.ModelAdmin):
+    """Read-only admin interface for archived ItemHistory events."""
+
+    list_display = ["item", "event_type", "from_location", "to_location", "acted_by", "created_at", "archived_at"]
+    list_filter = ["event_type", "created_at"]
+    list_select_related = ["item", "from_location", "to_location", "acted_by"]
+    search_fields = ["item__item_code", "item__title", "notes"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Admin interface for ExportJob model."""
+
+    list_display = ["id", "status", "requested_by", "row_count", "created_at", "finished_at"]
+    list_filter = ["status", "created_at"]
+    readonly_fields = ["filters_hash", "file_path", "row_count", "error", "created_at", "started_at", "finished_at"]
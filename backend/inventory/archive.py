@@ -0,0 +1,77 @@
+"""
+Cold-storage archival of old item history.
+
+Events older than a retention cutoff are copied into ArchivedItemHistory and
+removed from item_history in id batches, one transaction per batch. Each item's
+latest event and latest location-changing event (the ItemLatestEvent pointers)
+always stay in item_history, so current-state lookups, location rebuilds and
+seq assignment never need the archive. Readers that cover older ranges (history
+pages, as-of queries, rollup rebuilds) merge the two tables.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ID_CHUNK_SIZE, ArchivedItemHistory, ItemHistory, ItemLatestEvent
+
+HISTORY_RETENTION_DAYS = 365
+ARCHIVE_BATCH_SIZE = 5000
+
+ARCHIVED_FIELDS = [
+    "id",
+    "item_id",
+    "event_type",
+    "from_location_id",
+    "to_location_id",
+    "movement_request_id",
+    "acted_by_id",
+    "notes",
+    "created_at",
+    "seq",
+]
+
+
+def archive_cutoff(days=HISTORY_RETENTION_DAYS):
+    """Return the moment before which events are archived for a retention of `days` days."""
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_history(cutoff):
+    """ItemHistory events created before cutoff, minus every item's latest event and latest location event."""
+    kept = ItemLatestEvent.objects.order_by()
+    return (
+        ItemHistory.objects.filter(created_at__lt=cutoff)
+        # NOT IN over a subquery must not see NULLs, or it matches nothing.
+        .exclude(pk__in=kept.filter(latest_event__isnull=False).values("latest_event")).exclude(
+            pk__in=kept.filter(latest_location_event__isnull=False).values("latest_location_event")
+        )
+    )
+
+
+def archive_item_history(cutoff, batch_size=ARCHIVE_BATCH_SIZE, dry_run=False):
+    """
+    Move archivable events created before cutoff into ArchivedItemHistory.
+
+    Pointers in ItemLatestEvent only ever move to newer events, so an event that
+    is not kept when a batch is selected can be archived even while new events
+    are being written.
+
+    Returns:
+        int: Events archived (or, with dry_run, that would be)
+    """
+    if dry_run:
+        return archivable_history(cutoff).count()
+
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(archivable_history(cutoff).order_by("id").values(*ARCHIVED_FIELDS)[:batch_size])
+            if not rows:
+                break
+            ArchivedItemHistory.objects.bulk_create([ArchivedItemHistory(**row) for row in rows])
+            for start in range(0, len(rows), ID_CHUNK_SIZE):
+                ItemHistory.objects.filter(id__in=[row["id"] for row in rows[start : start + ID_CHUNK_SIZE]]).delete()
+        archived += len(rows)
+    return archived
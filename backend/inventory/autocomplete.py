@@ -0,0 +1,115 @@
+"""
+Prefix autocomplete index for the public catalogue search box.
+
+Every item contributes case-folded keys to AutocompleteEntry: its platform, its
+item_code and every word-start suffix of its title (so "Ocarina" completes
+"The Legend of Zelda: Ocarina of Time"). A prefix lookup is then an index range
+scan on the key column. Entries are rewritten whenever an item's title,
+platform or item_code changes.
+"""
+
+import re
+
+from django.db.models import Count
+
+AUTOCOMPLETE_FIELDS = ["title", "platform", "item_code"]
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Longest key stored; prefixes longer than this cannot match anyway.
+KEY_MAX_LENGTH = 255
+
+# Sorts after every character, closing the key range for a prefix.
+_PREFIX_END = "\U0010ffff"
+
+
+def fold(text):
+    """Case-fold text and reduce it to words separated by single spaces."""
+    return " ".join(re.findall(r"\w+", (text or "").casefold()))
+
+
+def item_entries(item):
+    """Return the (kind, key, label) entries for an item (or a dict of its fields)."""
+    get = item.get if isinstance(item, dict) else lambda field: getattr(item, field)
+    entries = set()
+
+    title = get("title") or ""
+    words = fold(title).split(" ")
+    for start in range(len(words)):
+        key = " ".join(words[start:])[:KEY_MAX_LENGTH]
+        if key:
+            entries.add(("title", key, title))
+
+    for kind, field in (("platform", "platform"), ("code", "item_code")):
+        value = get(field) or ""
+        key = fold(value)[:KEY_MAX_LENGTH]
+        if key:
+            entries.add((kind, key, value))
+    return entries
+
+
+def _build(item_id, entries):
+    from .models import AutocompleteEntry
+
+    return [AutocompleteEntry(item_id=item_id, kind=kind, key=key, label=label) for kind, key, label in entries]
+
+
+def index_item(item):
+    """Replace one item's autocomplete entries."""
+    from .models import AutocompleteEntry
+
+    AutocompleteEntry.objects.filter(item_id=item.pk).delete()
+    AutocompleteEntry.objects.bulk_create(_build(item.pk, item_entries(item)))
+
+
+def index_items(item_ids):
+    """Replace the autocomplete entries of many items with set-based statements."""
+    from .models import AutocompleteEntry, CollectionItem
+
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), 900):
+        chunk = item_ids[start : start + 900]
+        rows = CollectionItem.objects.filter(id__in=chunk).values("id", *AUTOCOMPLETE_FIELDS)
+        AutocompleteEntry.objects.filter(item_id__in=chunk).delete()
+        AutocompleteEntry.objects.bulk_create(
+            [entry for row in rows for entry in _build(row["id"], item_entries(row))], batch_size=1000
+        )
+
+
+def rebuild_index(chunk_size=2000):
+    """Repopulate the whole autocomplete index; returns the number of items indexed."""
+    from .models import AutocompleteEntry, CollectionItem
+
+    AutocompleteEntry.objects.all().delete()
+    indexed = 0
+    batch = []
+    for row in CollectionItem.objects.order_by().values("id", *AUTOCOMPLETE_FIELDS).iterator(chunk_size=chunk_size):
+        batch.extend(_build(row["id"], item_entries(row)))
+        indexed += 1
+        if len(batch) >= chunk_size:
+            AutocompleteEntry.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+    AutocompleteEntry.objects.bulk_create(batch, batch_size=1000)
+    return indexed
+
+
+def suggest(prefix, limit=AUTOCOMPLETE_DEFAULT_LIMIT):
+    """
+    Return up to limit suggestions for a typed prefix, among public items.
+
+    Returns:
+        list: [{"kind": "title"|"platform"|"code", "label": str, "count": int}],
+        most common first. count is the number of public items with that label.
+    """
+    from .models import AutocompleteEntry
+
+    key = fold(prefix)[:KEY_MAX_LENGTH]
+    if not key:
+        return []
+    rows = (
+        AutocompleteEntry.objects.filter(key__gte=key, key__lt=key + _PREFIX_END, item__is_public_visible=True)
+        .values("kind", "label")
+        .annotate(count=Count("item_id", distinct=True))
+        .order_by("-count", "label", "kind")[:limit]
+    )
+    return list(rows)
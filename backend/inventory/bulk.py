@@ -0,0 +1,83 @@
+"""
+Bulk changes to many collection items at once.
+
+Changes are applied with set-based UPDATEs and the resulting location moves are
+recorded with ItemHistory.objects.record_many, all in a single transaction.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import scan
+from .cache import invalidate_catalogue
+from .models import ID_CHUNK_SIZE, CollectionItem, ItemHistory
+
+# Filters accepted when selecting items by filter instead of ids.
+BULK_FILTER_FIELDS = ["box", "current_location", "platform", "item_type", "status", "is_public_visible", "is_on_floor"]
+
+
+def _chunks(values, size=ID_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def bulk_update_items(queryset, changes, user=None, notes=""):
+    """
+    Apply field changes to every item in queryset.
+
+    Args:
+        queryset: CollectionItem QuerySet selecting the items to change
+        changes: dict with any of 'box' (Box or None), 'current_location' (Location)
+            and 'is_public_visible', 'status' values
+        user: User recorded on the LOCATION_CORRECTION history events
+        notes: Optional notes for the history events
+
+    Moving items to a box at another location (or setting current_location)
+    moves them there: current_location/is_on_floor are updated, a
+    LOCATION_CORRECTION event is written per moved item and location counters
+    are adjusted.
+
+    Returns:
+        dict: {"updated": items changed, "moved": items whose location changed}
+    """
+    destination = changes.get("current_location")
+    if destination is None and changes.get("box") is not None:
+        destination = changes["box"].location
+
+    values = {"updated_at": timezone.now()}
+    if "box" in changes:
+        values["box"] = changes["box"]
+    for field in ("is_public_visible", "status"):
+        if field in changes:
+            values[field] = changes[field]
+
+    with transaction.atomic():
+        items_data = list(queryset.select_for_update().order_by().values_list("id", "current_location_id", "item_code"))
+        item_ids = [item_id for item_id, _, _ in items_data]
+        for chunk in _chunks(item_ids):
+            CollectionItem.objects.filter(id__in=chunk).update(**values)
+
+        moved = 0
+        if destination is not None:
+            # record_many moves the items and updates their location counters and cache entries.
+            moved = len(
+                ItemHistory.objects.record_many(
+                    ItemHistory(
+                        item_id=item_id,
+                        event_type="LOCATION_CORRECTION",
+                        from_location_id=from_location_id,
+                        to_location=destination,
+                        acted_by=user,
+                        notes=notes or f"Bulk update moved item to {destination.name}",
+                    )
+                    for item_id, from_location_id, _ in items_data
+                    if from_location_id != destination.id
+                )
+            )
+
+        if item_ids:
+            # update() bypasses model signals.
+            invalidate_catalogue()
+            scan.invalidate_codes(item_code for _, _, item_code in items_data)
+
+    return {"updated": len(item_ids), "moved": moved}
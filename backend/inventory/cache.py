@@ -0,0 +1,162 @@
+"""
+Caching helpers for the public catalogue endpoints.
+
+Cached catalogue payloads are keyed by a catalogue version number. Any change
+to items, locations, boxes or item locations bumps the version, which makes
+every previously cached payload unreachable at once.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+CATALOGUE_VERSION_KEY = "catalogue:version"
+CATALOGUE_CHANGED_AT_KEY = "catalogue:changed_at"
+
+# Query parameters that never change what a cached catalogue payload contains.
+FACET_IGNORED_PARAMS = ("page", "page_size", "cursor", "pagination", "ordering", "format")
+
+
+def get_version(key):
+    """Return the version counter stored at key, initializing it if the cache lost it."""
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a lost counter never reuses an older version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Increment the version counter stored at key."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_catalogue_version():
+    """Return the current catalogue version."""
+    return get_version(CATALOGUE_VERSION_KEY)
+
+
+def get_catalogue_changed_at():
+    """Return the Unix time of the latest catalogue version bump."""
+    changed_at = cache.get(CATALOGUE_CHANGED_AT_KEY)
+    if changed_at is None:
+        # Unknown once the cache lost it, so assume the catalogue just changed.
+        cache.add(CATALOGUE_CHANGED_AT_KEY, time.time(), timeout=None)
+        changed_at = cache.get(CATALOGUE_CHANGED_AT_KEY)
+    return changed_at
+
+
+def _bump_catalogue_version():
+    bump_version(CATALOGUE_VERSION_KEY)
+    cache.set(CATALOGUE_CHANGED_AT_KEY, time.time(), timeout=None)
+
+
+def invalidate_catalogue():
+    """
+    Invalidate every cached catalogue payload.
+
+    The version is bumped immediately and again once the surrounding
+    transaction commits, so a payload cached from pre-commit state is dropped too.
+    """
+    _bump_catalogue_version()
+    transaction.on_commit(_bump_catalogue_version)
+
+
+def make_cache_key(namespace, params, exclude=(), version=None):
+    """
+    Build a cache key from normalized query parameters.
+
+    Keys and values are sorted and blank values dropped, so '?a=1&b=2' and
+    '?b=2&a=1&c=' share an entry.
+    """
+    normalized = []
+    for name in sorted(params.keys()):
+        if name in exclude:
+            continue
+        values = sorted(value.strip() for value in params.getlist(name) if value.strip())
+        if values:
+            normalized.append([name, values])
+    digest = hashlib.sha256(json.dumps([namespace, normalized]).encode("utf-8")).hexdigest()
+    if version is None:
+        version = get_catalogue_version()
+    return f"catalogue:v{version}:{digest}"
+
+
+class CatalogueResponseCacheMixin:
+    """
+    ViewSet mixin that caches list and retrieve payloads for anonymous-safe,
+    read-only catalogue endpoints until the catalogue version changes.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        # Pagination links are absolute, so the host is part of the key.
+        namespace = f"{self.action}:{request.build_absolute_uri(request.path)}"
+        cache_key = make_cache_key(namespace, request.query_params, exclude=("format",))
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, settings.CATALOGUE_RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalListMixin:
+    """
+    ViewSet mixin that adds ETag/Last-Modified validators to list responses and
+    answers If-None-Match / If-Modified-Since with 304 Not Modified.
+
+    The ETag comes from one aggregate query (max updated_at and row count of the
+    filtered queryset) plus the catalogue version, so an unchanged list is
+    answered without fetching or serializing any rows. The aggregate itself is
+    cached until the catalogue version changes. Last-Modified is the time of the
+    latest catalogue version bump, so it also moves for changes that leave the
+    aggregate alone (hidden items, location counters).
+    """
+
+    def list(self, request, *args, **kwargs):
+        # The summary only changes when the catalogue version does, so it is cached too.
+        summary_key = make_cache_key(f"summary:{request.path}", request.query_params, exclude=FACET_IGNORED_PARAMS)
+        summary = cache.get(summary_key)
+        if summary is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            summary = queryset.order_by().aggregate(last_modified=Max("updated_at"), count=Count("id"))
+            cache.set(summary_key, summary, settings.CATALOGUE_RESPONSE_CACHE_TIMEOUT)
+        last_modified = summary["last_modified"]
+        last_modified_ts = int(get_catalogue_changed_at())
+
+        namespace = f"etag:{request.path}:{summary['count']}:{last_modified.isoformat() if last_modified else ''}"
+        cache_key = make_cache_key(namespace, request.query_params, exclude=("format",))
+        etag = quote_etag(hashlib.sha256(cache_key.encode("utf-8")).hexdigest()[:32])
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            # HTTP dates are whole seconds: until that second has passed, a later change
+            # could share it and be answered with a stale 304, so only the ETag is sent.
+            if int(time.time()) > last_modified_ts:
+                response["Last-Modified"] = http_date(last_modified_ts)
+        return response
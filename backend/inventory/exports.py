@@ -0,0 +1,302 @@
+"""
+CSV export of collection items.
+
+Rows are read with values_list() through a chunked server-side iterator and
+written out incrementally, so memory stays flat regardless of export size.
+Large exports can also run as background ExportJobs, written to disk by
+worker processes that each handle one id range.
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CollectionItem, ExportJob, Location
+from .utils import split_id_range
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HEADERS = [
+    "MADE ID",
+    "Title",
+    "Platform",
+    "Item Type",
+    "Box Code",
+    "Location",
+    "Location Type",
+    "Working Condition",
+    "Status",
+    "Created At",
+]
+
+EXPORT_COLUMNS = [
+    "item_code",
+    "title",
+    "platform",
+    "item_type",
+    "box__box_code",
+    "current_location__name",
+    "current_location__location_type",
+    "working_condition",
+    "status",
+    "created_at",
+]
+
+# Rows fetched per database round trip, and rows per chunk written to the client.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_WRITE_BATCH = 500
+
+
+def parse_export_filters(params):
+    """
+    Validate export query parameters.
+
+    Args:
+        params: QueryDict or dict with optional start_date, end_date (YYYY-MM-DD),
+            box_id (int) and record_type
+
+    Returns:
+        dict: The normalized filters that were provided
+
+    Raises:
+        ValueError: With a client-facing message when a parameter is invalid.
+    """
+    filters = {}
+
+    for name in ("start_date", "end_date"):
+        value = params.get(name)
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                # TypeError: JSON bodies may send numbers or lists.
+                raise ValueError(f"Invalid {name} format. Use YYYY-MM-DD.")
+            filters[name] = value
+
+    box_id = params.get("box_id")
+    if box_id:
+        try:
+            filters["box_id"] = int(box_id)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid box_id. Must be an integer.")
+
+    record_type = params.get("record_type")
+    if record_type:
+        if not isinstance(record_type, str):
+            raise ValueError("Invalid record_type. Must be a string.")
+        filters["record_type"] = record_type
+
+    return filters
+
+
+def _start_of_day(value):
+    day = datetime.strptime(value, "%Y-%m-%d").date()
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_queryset(filters):
+    """
+    Build the export queryset for filters returned by parse_export_filters().
+
+    Date filters become half-open created_at ranges rather than created_at__date
+    lookups, so they can use an index on created_at.
+    """
+    queryset = CollectionItem.objects.all()
+
+    if "start_date" in filters:
+        queryset = queryset.filter(created_at__gte=_start_of_day(filters["start_date"]))
+    if "end_date" in filters:
+        queryset = queryset.filter(created_at__lt=_start_of_day(filters["end_date"]) + timedelta(days=1))
+    if "box_id" in filters:
+        queryset = queryset.filter(box_id=filters["box_id"])
+    if "record_type" in filters:
+        queryset = queryset.filter(item_type=filters["record_type"])
+
+    return queryset
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield formatted CSV rows for a CollectionItem queryset without loading model instances."""
+    item_types = dict(CollectionItem.ITEM_TYPE_CHOICES)
+    statuses = dict(CollectionItem.STATUS_CHOICES)
+    location_types = dict(Location.LOCATION_TYPE_CHOICES)
+
+    rows = queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+    for (
+        item_code,
+        title,
+        platform,
+        item_type,
+        box_code,
+        location_name,
+        location_type,
+        working_condition,
+        status,
+        created_at,
+    ) in rows:
+        yield [
+            item_code,
+            title,
+            platform,
+            item_types.get(item_type, item_type),
+            box_code or "",
+            location_name or "",
+            location_types.get(location_type, location_type or ""),
+            "Yes" if working_condition else "No",
+            statuses.get(status, status),
+            created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else "",
+        ]
+
+
+class _Echo:
+    """File-like object whose write() returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, include_header=True, batch_size=EXPORT_WRITE_BATCH):
+    """Encode rows as CSV text, yielding a chunk every batch_size rows."""
+    writer = csv.writer(_Echo())
+    batch = [writer.writerow(EXPORT_HEADERS)] if include_header else []
+    for row in rows:
+        batch.append(writer.writerow(row))
+        if len(batch) >= batch_size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def hash_export_filters(filters):
+    """Stable digest of normalized export filters, used to find reusable jobs."""
+    return hashlib.sha256(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def submit_export_job(filters, user=None):
+    """
+    Queue an export job, or reuse an equivalent one.
+
+    A job with the same filters that is still pending, running (and started within
+    EXPORT_JOB_STALE_SECONDS), or that completed within EXPORT_JOB_REUSE_SECONDS
+    and still has its file, is returned instead of queuing new work.
+
+    Returns:
+        tuple: (ExportJob, created)
+    """
+    filters_hash = hash_export_filters(filters)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.EXPORT_JOB_REUSE_SECONDS)
+    stale_cutoff = now - timedelta(seconds=settings.EXPORT_JOB_STALE_SECONDS)
+    candidates = ExportJob.objects.filter(filters_hash=filters_hash).filter(
+        Q(status="PENDING")
+        | Q(status="RUNNING", started_at__gte=stale_cutoff)
+        | Q(status="COMPLETED", finished_at__gte=cutoff)
+    )
+    for job in candidates.order_by("-created_at"):
+        if job.status != "COMPLETED" or os.path.exists(job.file_path):
+            return job, False
+
+    job = ExportJob.objects.create(filters=filters, filters_hash=filters_hash, requested_by=user)
+    return job, True
+
+
+def claim_export_job(job):
+    """Move a pending job to RUNNING; False if another worker got to it first."""
+    claimed = ExportJob.objects.filter(pk=job.pk, status="PENDING").update(status="RUNNING", started_at=timezone.now())
+    return claimed == 1
+
+
+def fail_stale_export_jobs():
+    """
+    Mark RUNNING jobs started more than EXPORT_JOB_STALE_SECONDS ago as FAILED.
+    Their worker was stopped (OOM, deploy) before finishing; identical requests
+    then queue a fresh job. Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    return ExportJob.objects.filter(
+        status="RUNNING", started_at__lt=now - timedelta(seconds=settings.EXPORT_JOB_STALE_SECONDS)
+    ).update(status="FAILED", error="The export worker stopped before the export finished.", finished_at=now)
+
+
+def write_export_partition(filters, id_range, path):
+    """Write the CSV rows (no header) for items whose id is in id_range; return the row count."""
+    low, high = id_range
+    queryset = get_export_queryset(filters).filter(id__gte=low, id__lte=high).order_by("id")
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        for row in iter_export_rows(queryset):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_export_partition_task(args):
+    return write_export_partition(*args)
+
+
+def write_export_file(filters, path, workers=1, partitions=None):
+    """
+    Write a complete export CSV to path, split by id range across worker processes.
+
+    The export is split into `partitions` id ranges (one per worker by default),
+    each written to a side file, then concatenated in id order after the header
+    and moved into place atomically. Returns the row count.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ranges = split_id_range(get_export_queryset(filters), partitions or workers)
+    part_paths = [path.with_name(f"{path.name}.part{index}") for index in range(len(ranges))]
+    tasks = [(filters, id_range, str(part_path)) for id_range, part_path in zip(ranges, part_paths)]
+
+    try:
+        if workers > 1 and len(tasks) > 1:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                counts = list(pool.map(_write_export_partition_task, tasks))
+        else:
+            counts = [_write_export_partition_task(task) for task in tasks]
+
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+            csv.writer(out).writerow(EXPORT_HEADERS)
+            for part_path in part_paths:
+                with open(part_path, newline="", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp_path, path)
+    finally:
+        for part_path in part_paths:
+            if part_path.exists():
+                part_path.unlink()
+    return sum(counts)
+
+
+def run_export_job(job, workers=1):
+    """Build the file for a claimed (RUNNING) job and record the outcome on it."""
+    path = Path(settings.EXPORT_ROOT) / f"export_job_{job.pk}.csv"
+    try:
+        job.row_count = write_export_file(job.filters, path, workers=workers)
+    except Exception as e:
+        logger.exception("Export job %s failed", job.pk)
+        job.status = "FAILED"
+        job.error = str(e)
+    else:
+        job.status = "COMPLETED"
+        job.file_path = str(path)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "file_path", "row_count", "finished_at"])
+    return job
@@ -0,0 +1,213 @@
+"""
+Bulk import of collection items from CSV or JSON rows.
+
+Rows are validated and written in batches: item codes are checked against the
+database with one query per batch, locations and boxes are resolved from
+in-memory maps, and items plus their INITIAL history events are inserted with
+bulk_create. Invalid rows are reported individually without aborting the import.
+"""
+
+import csv
+import io
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from . import autocomplete, search
+from .cache import invalidate_catalogue
+from .models import Box, CollectionItem, DailyRollup, ItemHistory, Location
+
+IMPORT_BATCH_SIZE = 500
+
+# Fields that are resolved from the 'location'/'box' columns or derived, never copied from a row.
+_DERIVED_FIELDS = {"id", "current_location", "box", "is_on_floor", "location_event_at", "created_at", "updated_at"}
+IMPORT_FIELDS = [
+    field.name for field in CollectionItem._meta.concrete_fields if field.editable and field.name not in _DERIVED_FIELDS
+]
+
+
+def read_csv_rows(file):
+    """Yield dict rows from an uploaded or opened CSV file (bytes or text), lazily."""
+    if isinstance(file, io.TextIOBase):
+        text = file
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    yield from csv.DictReader(text)
+
+
+# Columns used as lookup keys; JSON rows may only give them as strings or integers.
+_KEY_COLUMNS = ("item_code", "box", "location")
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _is_key(value):
+    return isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool))
+
+
+def _key_errors(row):
+    """Per-column errors for key columns holding lists, objects or other non-key values."""
+    return {
+        name: ["Must be a string or an integer."]
+        for name in _KEY_COLUMNS
+        if row.get(name) is not None and not _is_key(row.get(name))
+    }
+
+
+def _row_code(row):
+    code = _clean(row.get("item_code"))
+    return code if _is_key(code) else ""
+
+
+class ItemImporter:
+    """
+    Imports item rows in batches.
+
+    Each row is a mapping of CollectionItem field names, plus 'location' (a
+    location name or id) and optional 'box' (a box code). When 'location' is
+    omitted the box's location is used. Blank values fall back to field defaults.
+    """
+
+    def __init__(self, user=None, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.created = 0
+        self.errors = []
+        self.seen_codes = set()
+
+        locations = list(Location.objects.all())
+        self.locations_by_id = {location.id: location for location in locations}
+        self.locations_by_name = {location.name.casefold(): location for location in locations}
+
+    def run(self, rows):
+        """Import every row; returns {"created", "failed", "errors"}."""
+        batch = []
+        for row_number, row in enumerate(rows, start=1):
+            batch.append((row_number, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return {"created": self.created, "failed": len(self.errors), "errors": self.errors}
+
+    def add_error(self, row_number, item_code, errors):
+        self.errors.append({"row": row_number, "item_code": item_code, "errors": errors})
+
+    def resolve_location(self, value):
+        value = _clean(value)
+        if value in (None, ""):
+            return None
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            location = self.locations_by_id.get(int(value))
+            if location:
+                return location
+        return self.locations_by_name.get(str(value).casefold())
+
+    def import_batch(self, batch):
+        rows = [row for _, row in batch if isinstance(row, dict) and not _key_errors(row)]
+        codes = {str(_clean(row.get("item_code"))) for row in rows if _clean(row.get("item_code")) not in (None, "")}
+        existing_codes = set(CollectionItem.objects.filter(item_code__in=codes).values_list("item_code", flat=True))
+        box_codes = {str(_clean(row.get("box"))) for row in rows if _clean(row.get("box")) not in (None, "")}
+        boxes = {box.box_code: box for box in Box.objects.filter(box_code__in=box_codes)}
+
+        pending = []
+        for row_number, row in batch:
+            if not isinstance(row, dict):
+                self.add_error(row_number, "", {"non_field_errors": ["Expected an object of item fields."]})
+                continue
+            item, errors = None, _key_errors(row)
+            if not errors:
+                item, errors = self.build_item(row, boxes)
+            if item is not None and not errors:
+                if item.item_code in existing_codes or item.item_code in self.seen_codes:
+                    errors = {"item_code": ["A collection item with this barcode/UUID already exists."]}
+            if errors:
+                self.add_error(row_number, _row_code(row), errors)
+                continue
+            self.seen_codes.add(item.item_code)
+            pending.append((row_number, item))
+
+        if pending:
+            self.save_batch(pending)
+
+    def build_item(self, row, boxes):
+        """Build an unsaved CollectionItem from a row; returns (item, errors)."""
+        errors = {}
+        values = {}
+        for name in IMPORT_FIELDS:
+            value = _clean(row.get(name))
+            if value not in (None, ""):
+                values[name] = value
+
+        box = None
+        box_code = _clean(row.get("box"))
+        if box_code not in (None, ""):
+            box = boxes.get(str(box_code))
+            if box is None:
+                errors["box"] = [f"Box '{box_code}' not found."]
+
+        location = self.resolve_location(row.get("location"))
+        if location is None:
+            if _clean(row.get("location")) not in (None, ""):
+                errors["location"] = [f"Location '{_clean(row.get('location'))}' not found."]
+            elif box is not None:
+                location = self.locations_by_id.get(box.location_id)
+            else:
+                errors["location"] = ["This field is required."]
+
+        item = CollectionItem(**values)
+        try:
+            item.clean_fields(exclude=["box", "current_location"])
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        if errors:
+            return None, errors
+
+        item.box = box
+        item.current_location = location
+        item.is_on_floor = location.location_type == "FLOOR"
+        return item, {}
+
+    def save_batch(self, pending):
+        items = [item for _, item in pending]
+        try:
+            with transaction.atomic():
+                CollectionItem.objects.bulk_create(items)
+                ItemHistory.objects.record_many(
+                    ItemHistory(
+                        item=item,
+                        event_type="INITIAL",
+                        to_location=item.current_location,
+                        acted_by=self.user,
+                        notes="Initial cataloging (import)",
+                    )
+                    for item in items
+                )
+                # bulk_create bypasses save() and model signals.
+                Location.adjust_counts("item_count", Counter(item.current_location_id for item in items))
+                DailyRollup.record(DailyRollup.ITEMS_ADDED, [(item.created_at, item.item_type) for item in items])
+                search.index_items([item.pk for item in items])
+                search.index_trigrams([item.pk for item in items])
+                autocomplete.index_items([item.pk for item in items])
+                invalidate_catalogue()
+        except IntegrityError as e:
+            # A concurrent writer took one of the codes; report the batch rather than abort the import.
+            for row_number, item in pending:
+                self.seen_codes.discard(item.item_code)
+                self.add_error(row_number, item.item_code, {"non_field_errors": [f"Could not save batch: {e}"]})
+            return
+        self.created += len(items)
+
+
+def import_items(rows, user=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import an iterable of item rows (see ItemImporter).
+
+    Returns:
+        dict: {"created": int, "failed": int, "errors": [{"row", "item_code", "errors"}]}
+    """
+    return ItemImporter(user=user, batch_size=batch_size).run(rows)
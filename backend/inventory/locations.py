@@ -0,0 +1,257 @@
+"""
+Item locations derived from history: set-based rebuilds and point-in-time queries.
+
+Each item's latest location-changing event is found with a window function over
+item_history, one id batch at a time, and compared with the item's projected
+current_location, is_on_floor and location_event_at. The scan is read-only and
+can be split into id ranges run by parallel worker processes. Only items that
+drifted are rewritten, afterwards, with batched UPDATEs from a single writer
+(SQLite allows one writer at a time).
+
+Point-in-time ("as of") queries find each item's last location-changing event at
+or before a timestamp with one probe of the (item, created_at) history index per
+item, and stream the results. Only items with no such event left in item_history
+probe the archive: archiving keeps each item's latest location event, so every
+archived location event is older than all of the item's unarchived ones.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+
+from django.db import connections, transaction
+from django.db.models import BigIntegerField, F, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import scan
+from .cache import invalidate_catalogue
+from .constants import LOCATION_CHANGING_EVENTS
+from .models import ID_CHUNK_SIZE, ArchivedItemHistory, CollectionItem, ItemHistory, Location
+from .utils import split_id_range
+
+LOCATION_REBUILD_BATCH_SIZE = 5000
+
+
+def latest_location_events(low, high):
+    """
+    Return {item_id: (to_location_id, created_at, is_floor)} for items in the inclusive
+    id range, from each item's latest location-changing event. Items whose latest
+    event has no to_location are left out, as update_location_from_history does.
+    """
+    ranked = (
+        ItemHistory.objects.filter(item_id__gte=low, item_id__lte=high, event_type__in=LOCATION_CHANGING_EVENTS)
+        .annotate(rank=Window(RowNumber(), partition_by=[F("item_id")], order_by=[F("seq").desc()]))
+        .filter(rank=1)
+        .order_by()
+        .values_list("item_id", "to_location_id", "created_at", "to_location__location_type")
+    )
+    return {
+        item_id: (to_location_id, created_at, location_type == "FLOOR")
+        for item_id, to_location_id, created_at, location_type in ranked
+        if to_location_id is not None
+    }
+
+
+def find_location_drift(id_range, batch_size=LOCATION_REBUILD_BATCH_SIZE):
+    """
+    Compare items in an inclusive (low, high) id range with their history, batch_size ids at a time.
+
+    Returns:
+        tuple: (items checked, [(item_id, to_location_id, created_at, is_floor)] for
+        items whose projection does not match their latest location event)
+    """
+    low, high = id_range
+    checked = 0
+    drift = []
+    for start in range(low, high + 1, batch_size):
+        end = min(start + batch_size - 1, high)
+        latest = latest_location_events(start, end)
+        checked += len(latest)
+        rows = (
+            CollectionItem.objects.filter(id__gte=start, id__lte=end)
+            .order_by()
+            .values_list("id", "current_location_id", "is_on_floor", "location_event_at")
+        )
+        for item_id, location_id, is_on_floor, applied_at in rows:
+            if item_id not in latest:
+                continue
+            to_location_id, created_at, is_floor = latest[item_id]
+            if location_id == to_location_id and is_on_floor == is_floor and applied_at and applied_at >= created_at:
+                continue
+            drift.append((item_id, to_location_id, created_at, is_floor))
+    return checked, drift
+
+
+def _find_location_drift_task(args):
+    return find_location_drift(*args)
+
+
+def apply_location_drift(drift):
+    """
+    Rewrite drifted items from find_location_drift with batched UPDATEs.
+
+    Each batch re-reads the items under lock and skips any that a newer event
+    reached since the scan. Returns the number of items updated.
+    """
+    updated = 0
+    for start in range(0, len(drift), ID_CHUNK_SIZE):
+        batch = drift[start : start + ID_CHUNK_SIZE]
+        with transaction.atomic():
+            current = {
+                item_id: (applied_at, item_code)
+                for item_id, applied_at, item_code in CollectionItem.objects.select_for_update()
+                .filter(id__in=[item_id for item_id, _, _, _ in batch])
+                .order_by()
+                .values_list("id", "location_event_at", "item_code")
+            }
+            now = timezone.now()
+            items = [
+                CollectionItem(
+                    id=item_id,
+                    current_location_id=to_location_id,
+                    is_on_floor=is_floor,
+                    location_event_at=created_at,
+                    updated_at=now,
+                )
+                for item_id, to_location_id, created_at, is_floor in batch
+                if item_id in current and (current[item_id][0] is None or current[item_id][0] <= created_at)
+            ]
+            CollectionItem.objects.bulk_update(items, ["current_location", "is_on_floor", "location_event_at", "updated_at"])
+            scan.invalidate_codes(current[item.id][1] for item in items)
+        updated += len(items)
+    return updated
+
+
+def rebuild_item_locations(batch_size=LOCATION_REBUILD_BATCH_SIZE, workers=1, dry_run=False, partitions=None):
+    """
+    Rebuild current_location, is_on_floor and location_event_at for every item from history.
+
+    The items' id span is split into `partitions` ranges (one per worker by
+    default) that are scanned by forked worker processes when workers > 1.
+    Unless dry_run is set, drifted items are then rewritten and location counters
+    are recounted.
+
+    Returns:
+        dict: {"checked": items with location history, "drifted": items that did
+        not match it, "updated": items rewritten}
+    """
+    ranges = split_id_range(CollectionItem.objects.all(), partitions or workers)
+    tasks = [(id_range, batch_size) for id_range in ranges]
+    if workers > 1 and len(tasks) > 1:
+        # Forked workers must open their own database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            results = list(pool.map(_find_location_drift_task, tasks))
+    else:
+        results = [_find_location_drift_task(task) for task in tasks]
+
+    drift = [row for _, rows in results for row in rows]
+    result = {"checked": sum(checked for checked, _ in results), "drifted": len(drift), "updated": 0}
+    if not dry_run:
+        result["updated"] = apply_location_drift(drift)
+        Location.rebuild_counts()
+        invalidate_catalogue()
+    return result
+
+
+def parse_as_of(value):
+    """
+    Parse an as-of moment: an ISO 8601 datetime, or YYYY-MM-DD for the end of that day.
+    Naive values are in the current time zone.
+
+    Raises:
+        ValueError: With a client-facing message when the value is invalid.
+    """
+    moment = None
+    try:
+        moment = parse_datetime(value or "")
+        if moment is None:
+            day = parse_date(value or "")
+            if day is not None:
+                moment = datetime.combine(day, time.max)
+    except ValueError:
+        pass
+    if moment is None:
+        raise ValueError("Invalid timestamp. Use YYYY-MM-DD or an ISO 8601 datetime.")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def iter_locations_as_of(at, location_ids=None, floor_only=False, chunk_size=ID_CHUNK_SIZE):
+    """
+    Stream each item's location as of `at`, from its last location-changing event at or before it.
+
+    Items are read in id order through a chunked iterator, each with one index
+    probe for that event's id; the events themselves are then fetched by primary
+    key per chunk. Memory stays flat however many items and events there are.
+
+    Args:
+        at: Aware datetime
+        location_ids: Optional iterable of location ids to restrict the result to
+        floor_only: Only include items that were at a FLOOR location
+
+    Yields:
+        dict: {"id", "item_code", "title", "location_id", "location_name",
+        "location_type", "event_at"}. Items with no such event (e.g. catalogued
+        later) are left out.
+    """
+    locations = {location.id: location for location in Location.objects.all()}
+    wanted = set(location_ids) if location_ids is not None else None
+    if floor_only:
+        floor_ids = {location.id for location in locations.values() if location.location_type == "FLOOR"}
+        wanted = floor_ids if wanted is None else wanted & floor_ids
+
+    def last_event(model):
+        # Within an item id follows seq, and unlike seq it is part of the (item, created_at) index.
+        events = model.objects.filter(item_id=OuterRef("pk"), event_type__in=LOCATION_CHANGING_EVENTS, created_at__lte=at)
+        return Subquery(events.order_by("-created_at", "-id").values("pk")[:1])
+
+    items = (
+        # COALESCE only evaluates the archive probe when item_history has no match.
+        CollectionItem.objects.annotate(
+            event_id=Coalesce(last_event(ItemHistory), last_event(ArchivedItemHistory), output_field=BigIntegerField())
+        )
+        .order_by("id")
+        .values_list("id", "item_code", "title", "event_id")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    chunk = []
+    for row in items:
+        if row[3] is not None:
+            chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _as_of_rows(chunk, locations, wanted)
+            chunk = []
+    yield from _as_of_rows(chunk, locations, wanted)
+
+
+def _as_of_rows(chunk, locations, wanted):
+    event_ids = [event_id for _, _, _, event_id in chunk]
+    events = {}
+    for model in (ItemHistory, ArchivedItemHistory):
+        # Archived rows keep their item_history id, so the remaining ids are archived events.
+        missing = [event_id for event_id in event_ids if event_id not in events]
+        if not missing:
+            break
+        for event_id, location_id, created_at in model.objects.filter(pk__in=missing).values_list(
+            "id", "to_location_id", "created_at"
+        ):
+            events[event_id] = (location_id, created_at)
+    for item_id, item_code, title, event_id in chunk:
+        location_id, event_at = events[event_id]
+        if location_id is None or (wanted is not None and location_id not in wanted):
+            continue
+        location = locations.get(location_id)
+        yield {
+            "id": item_id,
+            "item_code": item_code,
+            "title": title,
+            "location_id": location_id,
+            "location_name": location.name,
+            "location_type": location.location_type,
+            "event_at": event_at,
+        }
@@ -0,0 +1,44 @@
+"""
+Management command to move old item history events into the archive table.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.archive import ARCHIVE_BATCH_SIZE, HISTORY_RETENTION_DAYS, archive_cutoff, archive_item_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Move item history events older than the retention period into the archive table, "
+        "keeping each item's latest event and latest location-changing event"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=HISTORY_RETENTION_DAYS,
+            help=f"Keep events from the last N days in item_history (default: {HISTORY_RETENTION_DAYS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f"Events moved per transaction (default: {ARCHIVE_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many events would be archived",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative.")
+
+        cutoff = archive_cutoff(options["days"])
+        count = archive_item_history(cutoff, batch_size=max(1, options["batch_size"]), dry_run=options["dry_run"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{count} history events older than {cutoff.isoformat()} would be archived")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} history events older than {cutoff.isoformat()}"))
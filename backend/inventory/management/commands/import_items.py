@@ -0,0 +1,52 @@
+"""
+Management command to bulk import collection items from a CSV or JSON file.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.imports import IMPORT_BATCH_SIZE, import_items, read_csv_rows
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Bulk import collection items (and their INITIAL history) from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=str, help="Path to a .csv file or a .json file containing a list of items")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Rows validated and inserted per batch",
+        )
+        parser.add_argument(
+            "--user-email",
+            type=str,
+            default=None,
+            help="Email of the user recorded as acting on the INITIAL history events",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user_email"]:
+            user = User.objects.filter(email=options["user_email"]).first()
+            if user is None:
+                raise CommandError(f"User {options['user_email']} not found")
+
+        path = options["path"]
+        try:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                if path.lower().endswith(".json"):
+                    rows = json.load(f)
+                    if not isinstance(rows, list):
+                        raise CommandError("JSON import file must contain a list of items")
+                    result = import_items(rows, user=user, batch_size=options["batch_size"])
+                else:
+                    result = import_items(read_csv_rows(f), user=user, batch_size=options["batch_size"])
+        except OSError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        for error in result["errors"]:
+            self.stdout.write(self.style.ERROR(f"Row {error['row']} ({error['item_code']}): {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(f"Imported {result['created']} items, {result['failed']} rows failed"))
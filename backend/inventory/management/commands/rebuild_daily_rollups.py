@@ -0,0 +1,35 @@
+"""
+Management command to refresh the daily rollup table behind the admin time-series charts.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from inventory.models import DailyRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily rollups from items and history. By default only days from the latest "
+        "rolled-up day onwards are recomputed; use --full or --since to go further back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=str, help="Recompute days from this date (YYYY-MM-DD)")
+        parser.add_argument("--full", action="store_true", help="Recompute every day")
+
+    def handle(self, *args, **options):
+        if options["full"]:
+            since = None
+        elif options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Invalid --since format. Use YYYY-MM-DD.")
+        else:
+            since = DailyRollup.objects.aggregate(latest=Max("day"))["latest"]
+
+        written = DailyRollup.rebuild(since=since)
+        scope = f"from {since}" if since else "for all days"
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows {scope}"))
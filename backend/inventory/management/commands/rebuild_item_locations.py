@@ -1,13 +1,17 @@
 """
-Simple management command to rebuild item locations from history.
+Management command to rebuild item locations from history.
 """
 
 from django.core.management.base import BaseCommand
+from inventory.locations import LOCATION_REBUILD_BATCH_SIZE, rebuild_item_locations
 from inventory.models import CollectionItem
 
 
 class Command(BaseCommand):
-    help = "Rebuild current_location and is_on_floor for all CollectionItems based on their history"
+    help = (
+        "Rebuild current_location and is_on_floor for all CollectionItems based on their history, "
+        "then recount items and boxes per location"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,6 +19,23 @@ class Command(BaseCommand):
             type=int,
             help="Update only the specified item ID",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LOCATION_REBUILD_BATCH_SIZE,
+            help=f"Item ids per set-based batch (default: {LOCATION_REBUILD_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes, each scanning one id range (default: 1)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many items have drifted from their history",
+        )
 
     def handle(self, *args, **options):
         item_id = options.get("item_id")
@@ -27,16 +48,19 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.SUCCESS(f"Updated item {item_id}"))
             except CollectionItem.DoesNotExist:
                 self.stdout.write(self.style.ERROR(f"Item {item_id} not found"))
-        else:
-            # All items
-            items = CollectionItem.objects.all()
-            updated_count = 0
-
-            for item in items:
-                try:
-                    item.update_location_from_history()
-                    updated_count += 1
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"Error updating item {item.id}: {e}"))
-
-            self.stdout.write(self.style.SUCCESS(f"Updated {updated_count} items"))
+            return
+
+        dry_run = options["dry_run"]
+        result = rebuild_item_locations(
+            batch_size=max(1, options["batch_size"]),
+            workers=max(1, options["workers"]),
+            dry_run=dry_run,
+        )
+
+        if dry_run:
+            self.stdout.write(f"Checked {result['checked']} items: {result['drifted']} drifted from their history")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {result['updated']} of {result['checked']} items"))
+        # Any drift in the denormalized per-location counters was repaired too.
+        self.stdout.write(self.style.SUCCESS("Rebuilt location box/item counts"))
@@ -0,0 +1,24 @@
+"""
+Management command to rebuild the catalogue full-text, fuzzy (trigram) and autocomplete indexes.
+"""
+
+from django.core.management.base import BaseCommand
+from inventory import autocomplete, search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text, trigram and autocomplete search indexes for CollectionItems"
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild_index()
+
+        if indexed is None:
+            self.stdout.write(self.style.WARNING("Search index is maintained by the database; nothing to rebuild"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} items"))
+
+        trigram_indexed = search.rebuild_trigram_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed trigrams for {trigram_indexed} items"))
+
+        autocomplete_indexed = autocomplete.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed autocomplete entries for {autocomplete_indexed} items"))
@@ -0,0 +1,40 @@
+"""
+Management command that processes queued background export jobs.
+Run it from cron or a process supervisor; it exits once the queue is empty.
+"""
+
+from django.core.management.base import BaseCommand
+from inventory.exports import claim_export_job, fail_stale_export_jobs, run_export_job
+from inventory.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Build the CSV files for pending export jobs, splitting each export by id range across worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of worker processes per export (1 runs in this process)",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        processed = 0
+
+        stale = fail_stale_export_jobs()
+        if stale:
+            self.stdout.write(self.style.WARNING(f"Marked {stale} stale running export jobs as failed"))
+
+        for job in ExportJob.objects.filter(status="PENDING").order_by("created_at"):
+            if not claim_export_job(job):
+                continue
+            job = run_export_job(job, workers=workers)
+            processed += 1
+            if job.status == "COMPLETED":
+                self.stdout.write(self.style.SUCCESS(f"Export job {job.id}: wrote {job.row_count} rows"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Export job {job.id} failed: {job.error}"))
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} export jobs"))
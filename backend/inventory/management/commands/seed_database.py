@@ -71,6 +71,7 @@ class Command(BaseCommand):
         # Create collection items
         self.stdout.write("Creating collection items...")
         items_created = 0
+        initial_events = []
         for item_data in data.get("items", []):
             box = boxes.get(item_data.get("box"))
             location = locations.get(item_data["location"])
@@ -112,7 +113,10 @@ class Command(BaseCommand):
 
             if created:
                 items_created += 1
-                ItemHistory.objects.create(item=item, event_type="INITIAL", to_location=location, notes="Initial cataloging")
+                initial_events.append(
+                    ItemHistory(item=item, event_type="INITIAL", to_location=location, notes="Initial cataloging")
+                )
+        ItemHistory.objects.record_many(initial_events)
         self.stdout.write(f"  Created {items_created} collection items")
 
         # Create admin user if not exists
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_collectionitem_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="collectionitem",
+            index=models.Index(fields=["created_at", "id"], name="collection__created_bffc25_idx"),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_location_counts(apps, schema_editor):
+    Location = apps.get_model("inventory", "Location")
+    Box = apps.get_model("inventory", "Box")
+    CollectionItem = apps.get_model("inventory", "CollectionItem")
+
+    box_counts = Box.objects.filter(location=OuterRef("pk")).order_by().values("location").annotate(count=Count("id"))
+    item_counts = (
+        CollectionItem.objects.filter(current_location=OuterRef("pk"))
+        .order_by()
+        .values("current_location")
+        .annotate(count=Count("id"))
+    )
+    Location.objects.update(
+        box_count=Coalesce(Subquery(box_counts.values("count")), Value(0)),
+        item_count=Coalesce(Subquery(item_counts.values("count")), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_collectionitem_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="location",
+            name="box_count",
+            field=models.IntegerField(default=0, editable=False, help_text="Boxes currently at this location"),
+        ),
+        migrations.AddField(
+            model_name="location",
+            name="item_count",
+            field=models.IntegerField(default=0, editable=False, help_text="Items currently at this location"),
+        ),
+        migrations.RunPython(populate_location_counts, migrations.RunPython.noop),
+    ]
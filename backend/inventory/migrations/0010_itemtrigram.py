@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from inventory import search
+
+
+def populate_trigrams(apps, schema_editor):
+    CollectionItem = apps.get_model("inventory", "CollectionItem")
+    ItemTrigram = apps.get_model("inventory", "ItemTrigram")
+    rows = CollectionItem.objects.values("id", *search.TRIGRAM_FIELDS).iterator(chunk_size=2000)
+    ItemTrigram.objects.bulk_create(
+        (ItemTrigram(item_id=row["id"], gram=gram) for row in rows for gram in search.item_trigrams(row)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0009_exportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemTrigram",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("gram", models.CharField(max_length=3)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="trigrams", to="inventory.collectionitem"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "item_trigrams",
+                "indexes": [models.Index(fields=["gram", "item"], name="item_trigra_gram_fad1ea_idx")],
+                "constraints": [models.UniqueConstraint(fields=("item", "gram"), name="unique_item_trigram")],
+            },
+        ),
+        migrations.RunPython(populate_trigrams, migrations.RunPython.noop),
+    ]
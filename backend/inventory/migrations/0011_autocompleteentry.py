@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from inventory import autocomplete
+
+
+def populate_autocomplete(apps, schema_editor):
+    CollectionItem = apps.get_model("inventory", "CollectionItem")
+    AutocompleteEntry = apps.get_model("inventory", "AutocompleteEntry")
+    rows = CollectionItem.objects.values("id", *autocomplete.AUTOCOMPLETE_FIELDS).iterator(chunk_size=2000)
+    AutocompleteEntry.objects.bulk_create(
+        (
+            AutocompleteEntry(item_id=row["id"], kind=kind, key=key, label=label)
+            for row in rows
+            for kind, key, label in autocomplete.item_entries(row)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_itemtrigram"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AutocompleteEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("title", "Title"), ("platform", "Platform"), ("code", "Item Code")], max_length=10
+                    ),
+                ),
+                ("key", models.CharField(help_text="Case-folded text matched by prefix", max_length=255)),
+                ("label", models.CharField(help_text="Text shown as the suggestion", max_length=255)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="autocomplete_entries",
+                        to="inventory.collectionitem",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "autocomplete_entries",
+                "indexes": [models.Index(fields=["key"], name="autocomplet_key_8465ed_idx")],
+            },
+        ),
+        migrations.RunPython(populate_autocomplete, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:39
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    CollectionItem = apps.get_model("inventory", "CollectionItem")
+    ItemHistory = apps.get_model("inventory", "ItemHistory")
+    DailyRollup = apps.get_model("inventory", "DailyRollup")
+    rows = []
+    for metric, model, field in (("items_added", CollectionItem, "item_type"), ("history_events", ItemHistory, "event_type")):
+        grouped = model.objects.order_by().annotate(day=TruncDate("created_at")).values("day", field).annotate(count=Count("id"))
+        rows.extend(DailyRollup(metric=metric, day=row["day"], dimension=row[field], count=row["count"]) for row in grouped)
+    DailyRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0011_autocompleteentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[("items_added", "Items Added"), ("history_events", "History Events")], max_length=30
+                    ),
+                ),
+                ("dimension", models.CharField(blank=True, help_text="item_type or event_type", max_length=30)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "db_table": "daily_rollups",
+                "ordering": ["day"],
+                "constraints": [models.UniqueConstraint(fields=("metric", "day", "dimension"), name="unique_daily_rollup")],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
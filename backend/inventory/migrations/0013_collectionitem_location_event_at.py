@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:43
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def populate_location_event_at(apps, schema_editor):
+    CollectionItem = apps.get_model("inventory", "CollectionItem")
+    ItemHistory = apps.get_model("inventory", "ItemHistory")
+    latest = (
+        ItemHistory.objects.filter(
+            item_id=OuterRef("pk"), event_type__in=["INITIAL", "ARRIVED", "VERIFIED", "LOCATION_CORRECTION"]
+        )
+        .order_by()
+        .values("item_id")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    CollectionItem.objects.update(location_event_at=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_dailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="collectionitem",
+            name="location_event_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When the location event current_location reflects happened", null=True
+            ),
+        ),
+        migrations.RunPython(populate_location_event_at, migrations.RunPython.noop),
+    ]
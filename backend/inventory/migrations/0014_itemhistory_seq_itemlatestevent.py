@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+LOCATION_CHANGING_EVENTS = {"INITIAL", "ARRIVED", "VERIFIED", "LOCATION_CORRECTION"}
+
+
+def populate_seq_and_snapshots(apps, schema_editor):
+    """Number existing events per item in (created_at, id) order and build each item's snapshot."""
+    ItemHistory = apps.get_model("inventory", "ItemHistory")
+    ItemLatestEvent = apps.get_model("inventory", "ItemLatestEvent")
+    events = []
+    snapshots = []
+    snapshot = None
+    rows = ItemHistory.objects.order_by("item_id", "created_at", "id").values_list("id", "item_id", "event_type")
+    for event_id, item_id, event_type in rows.iterator(chunk_size=2000):
+        if snapshot is None or snapshot.item_id != item_id:
+            snapshot = ItemLatestEvent(item_id=item_id)
+            snapshots.append(snapshot)
+        snapshot.last_seq += 1
+        snapshot.latest_event_id = event_id
+        if event_type in LOCATION_CHANGING_EVENTS:
+            snapshot.latest_location_event_id = event_id
+        events.append(ItemHistory(id=event_id, seq=snapshot.last_seq))
+        if len(events) >= 2000:
+            ItemHistory.objects.bulk_update(events, ["seq"], batch_size=500)
+            events = []
+    ItemHistory.objects.bulk_update(events, ["seq"], batch_size=500)
+    ItemLatestEvent.objects.bulk_create(snapshots, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0013_collectionitem_location_event_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemhistory",
+            name="seq",
+            field=models.PositiveIntegerField(
+                editable=False, help_text="Per-item event number, in write order (assigned on save)", null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="ItemLatestEvent",
+            fields=[
+                (
+                    "item",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="latest_event_snapshot",
+                        serialize=False,
+                        to="inventory.collectionitem",
+                    ),
+                ),
+                ("last_seq", models.PositiveIntegerField(default=0)),
+                (
+                    "latest_event",
+                    models.ForeignKey(
+                        null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="inventory.itemhistory"
+                    ),
+                ),
+                (
+                    "latest_location_event",
+                    models.ForeignKey(
+                        null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="inventory.itemhistory"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "item_latest_events",
+            },
+        ),
+        migrations.RunPython(populate_seq_and_snapshots, migrations.RunPython.noop),
+    ]
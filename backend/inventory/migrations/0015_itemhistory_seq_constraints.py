@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0014_itemhistory_seq_itemlatestevent"),
+        ("movements", "0004_delete_itemhistory"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="itemhistory",
+            name="seq",
+            field=models.PositiveIntegerField(
+                editable=False, help_text="Per-item event number, in write order (assigned on save)"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="itemhistory",
+            index=models.Index(fields=["item", "event_type", "seq"], name="item_histor_item_id_1b8349_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="itemhistory",
+            constraint=models.UniqueConstraint(fields=("item", "seq"), name="unique_item_history_seq"),
+        ),
+    ]
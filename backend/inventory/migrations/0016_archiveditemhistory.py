@@ -0,0 +1,102 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0015_itemhistory_seq_constraints"),
+        ("movements", "0004_delete_itemhistory"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedItemHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        help_text="Id of the ItemHistory row this event was archived from", primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("INITIAL", "Initial"),
+                            ("MOVE_REQUESTED", "Move Requested"),
+                            ("MOVE_APPROVED", "Move Approved"),
+                            ("MOVE_REJECTED", "Move Rejected"),
+                            ("IN_TRANSIT", "In Transit"),
+                            ("ARRIVED", "Arrived"),
+                            ("VERIFIED", "Verified"),
+                            ("LOCATION_CORRECTION", "Location Correction"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("notes", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField()),
+                ("seq", models.PositiveIntegerField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "acted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "from_location",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="inventory.location",
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_history",
+                        to="inventory.collectionitem",
+                    ),
+                ),
+                (
+                    "movement_request",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="movements.itemmovementrequest",
+                    ),
+                ),
+                (
+                    "to_location",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="inventory.location",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Archived item histories",
+                "db_table": "item_history_archive",
+                "ordering": ["created_at"],
+                "indexes": [models.Index(fields=["item", "created_at"], name="item_histor_item_id_d141cb_idx")],
+            },
+        ),
+    ]
@@ -1,10 +1,17 @@
-from django.db import models, transaction
+from collections import Counter
+from datetime import datetime
+
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 import logging
 
+from . import autocomplete, scan, search
+from .cache import invalidate_catalogue
 from .constants import LOCATION_CHANGING_EVENTS
 
 logger = logging.getLogger(__name__)
@@ -27,6 +34,10 @@ class Location(models.Model):
     location_type = models.CharField(max_length=30, choices=LOCATION_TYPE_CHOICES)
     description = models.TextField(blank=True)
 
+    # Denormalized counters, maintained incrementally as boxes and items move
+    box_count = models.IntegerField(default=0, editable=False, help_text="Boxes currently at this location")
+    item_count = models.IntegerField(default=0, editable=False, help_text="Items currently at this location")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -37,12 +48,96 @@ class Location(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_location_type_display()})"
 
+    @classmethod
+    def adjust_counts(cls, counter, deltas):
+        """
+        Apply {location_id: delta} increments to a counter column ('box_count' or 'item_count').
+        Issues one UPDATE per distinct delta value.
+        """
+        by_delta = {}
+        for location_id, delta in deltas.items():
+            if location_id is not None and delta:
+                by_delta.setdefault(delta, []).append(location_id)
+        for delta, location_ids in by_delta.items():
+            cls.objects.filter(pk__in=location_ids).update(**{counter: F(counter) + delta})
+
+    @classmethod
+    def rebuild_counts(cls):
+        """Recompute every location's box_count and item_count from scratch (repair path)."""
+        box_counts = (
+            Box.objects.filter(location=OuterRef("pk"))
+            .order_by()
+            .values("location")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        item_counts = (
+            CollectionItem.objects.filter(current_location=OuterRef("pk"))
+            .order_by()
+            .values("current_location")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return cls.objects.update(
+            box_count=Coalesce(Subquery(box_counts), Value(0)),
+            item_count=Coalesce(Subquery(item_counts), Value(0)),
+        )
+
+
+class LocationCounterMixin:
+    """
+    Keeps a Location counter column in step with this model's location foreign key.
+    Subclasses set location_field (the FK name) and location_counter (the Location column).
+    """
+
+    location_field = None
+    location_counter = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        attname = f"{cls.location_field}_id"
+        if attname in instance.__dict__:
+            instance._loaded_location_id = instance.__dict__[attname]
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        adding = self._state.adding
+        location_saved = update_fields is None or {self.location_field, f"{self.location_field}_id"} & set(update_fields)
+
+        previous_location_id = None
+        if not adding and location_saved:
+            previous_location_id = getattr(self, "_loaded_location_id", None)
+            if previous_location_id is None:
+                previous_location_id = (
+                    type(self).objects.filter(pk=self.pk).values_list(f"{self.location_field}_id", flat=True).first()
+                )
+
+        super().save(*args, **kwargs)
+
+        current_location_id = getattr(self, f"{self.location_field}_id")
+        if adding or (location_saved and previous_location_id != current_location_id):
+            deltas = {current_location_id: 1}
+            if not adding:
+                deltas[previous_location_id] = -1
+            Location.adjust_counts(self.location_counter, deltas)
+            # Keep an already-loaded related Location consistent with the database.
+            cached_location = self._state.fields_cache.get(self.location_field)
+            if cached_location is not None:
+                setattr(cached_location, self.location_counter, getattr(cached_location, self.location_counter) + 1)
+        if adding or location_saved:
+            self._loaded_location_id = current_location_id
+
 
-class Box(models.Model):
+class Box(LocationCounterMixin, models.Model):
     """
     Physical boxes that hold items.
     """
 
+    location_field = "location"
+    location_counter = "box_count"
+
     box_code = models.CharField(max_length=100, unique=True, help_text="Scannable code")
     label = models.CharField(max_length=255, blank=True, help_text="Human-friendly label")
     description = models.TextField(blank=True)
@@ -59,6 +154,13 @@ class Box(models.Model):
     def __str__(self):
         return f"{self.box_code} - {self.label or 'Unlabeled'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a renamed box can be dropped from the scan cache under its old code.
+        instance._loaded_box_code = instance.__dict__.get("box_code")
+        return instance
+
     def mark_as_arrived(self, destination_location, user=None, comment=""):
         """
         Move this box to destination and keep all contained items in sync.
@@ -67,26 +169,13 @@ class Box(models.Model):
             self.location = destination_location
             self.save(update_fields=["location", "updated_at"])
 
-            destination_is_floor = destination_location.location_type == "FLOOR"
-            # Fetch only fields needed to batch-write item state and history.
-            items_data = list(self.items.values_list("id", "current_location_id", "status"))
-            items_to_update = []
-            history_entries = []
+            # Fetch only fields needed to write the history.
+            items_data = list(self.items.values_list("id", "current_location_id"))
 
             if items_data:
-                now = timezone.now()
-                for item_id, from_location_id, status in items_data:
-                    items_to_update.append(
-                        CollectionItem(
-                            id=item_id,
-                            current_location_id=destination_location.id,
-                            is_on_floor=destination_is_floor,
-                            status="AVAILABLE" if status == "IN_TRANSIT" else status,
-                            updated_at=now,
-                        )
-                    )
-            for item_id, from_location_id, _ in items_data:
-                history_entries.append(
+                self.items.filter(status="IN_TRANSIT").update(status="AVAILABLE", updated_at=timezone.now())
+                # Also moves the items and updates their location counters and cache entries.
+                ItemHistory.objects.record_many(
                     ItemHistory(
                         item_id=item_id,
                         event_type="ARRIVED",
@@ -95,23 +184,19 @@ class Box(models.Model):
                         acted_by=user,
                         notes=comment or f"Box {self.box_code} arrived at {destination_location.name}",
                     )
+                    for item_id, from_location_id in items_data
                 )
-            if items_to_update:
-                CollectionItem.objects.bulk_update(
-                    items_to_update,
-                    ["current_location", "is_on_floor", "status", "updated_at"],
-                )
-            if history_entries:
-                ItemHistory.objects.bulk_create(history_entries)
-
             return len(items_data)
 
 
-class CollectionItem(models.Model):
+class CollectionItem(LocationCounterMixin, models.Model):
     """
     Main collection table - each game/object in the collection.
     """
 
+    location_field = "current_location"
+    location_counter = "item_count"
+
     ITEM_TYPE_CHOICES = [
         ("SOFTWARE", "Software"),
         ("HARDWARE", "Hardware"),
@@ -191,6 +276,9 @@ class CollectionItem(models.Model):
 
     is_public_visible = models.BooleanField(default=True, help_text="For public catalogue")
     is_on_floor = models.BooleanField(default=False, help_text="Redundant but fast for queries")
+    location_event_at = models.DateTimeField(
+        null=True, blank=True, editable=False, help_text="When the location event current_location reflects happened"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -202,23 +290,237 @@ class CollectionItem(models.Model):
             models.Index(fields=["item_code"]),
             models.Index(fields=["is_on_floor"]),
             models.Index(fields=["is_public_visible"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self):
         return f"{self.item_code} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a re-coded item can be dropped from the scan cache under its old code.
+        instance._loaded_item_code = instance.__dict__.get("item_code")
+        return instance
+
+    def apply_location_event(self, event):
+        """
+        Project a new location-changing history event onto current_location and is_on_floor.
+
+        The event is compared against location_event_at, the last event applied, so
+        events that arrive out of order never move the item back. No history is read;
+        the item's stored location state is re-read first, so a stale instance
+        cannot skip a move or skew the location counters.
+
+        Returns:
+            bool: True if the event was applied
+        """
+        with transaction.atomic():
+            self.refresh_location_state()
+            if self.location_event_at is not None and event.created_at < self.location_event_at:
+                return False
+
+            self.location_event_at = event.created_at
+            update_fields = ["location_event_at", "updated_at"]
+            if event.to_location_id is not None and event.to_location_id != self.current_location_id:
+                # Only a move needs the destination's type; it is usually cached on the event.
+                self.current_location = event.to_location
+                self.is_on_floor = event.to_location.location_type == "FLOOR"
+                update_fields += ["current_location", "is_on_floor"]
+            self.save(update_fields=update_fields)
+        return True
+
+    def refresh_location_state(self):
+        """
+        Re-read current_location and location_event_at from the database, locking the row.
+        LocationCounterMixin computes counter deltas from the location loaded here.
+        """
+        location_id, location_event_at = (
+            CollectionItem.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("current_location_id", "location_event_at")
+            .get()
+        )
+        self.current_location_id = location_id
+        self._loaded_location_id = location_id
+        self.location_event_at = location_event_at
+
     def update_location_from_history(self):
         """
-        Update current_location and is_on_floor based on item history.
-        Call this after adding history events.
+        Recompute current_location and is_on_floor from the full item history.
+        Events are applied incrementally as they are written (see apply_location_event);
+        this is the repair path for items whose projection has drifted.
+        """
+        from .utils import get_latest_location_event
+
+        event = get_latest_location_event(self.id)
+        if event and event.to_location:
+            self.refresh_location_state()
+            self.current_location = event.to_location
+            self.is_on_floor = event.to_location.location_type == "FLOOR"
+            self.location_event_at = event.created_at
+            self.save(update_fields=["current_location", "is_on_floor", "location_event_at", "updated_at"])
+
+
+class ItemTrigram(models.Model):
+    """
+    Trigram index over CollectionItem title and platform, for typo-tolerant search.
+    One row per distinct trigram of an item; maintained on save (see search.py).
+    """
+
+    item = models.ForeignKey(CollectionItem, on_delete=models.CASCADE, related_name="trigrams")
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = "item_trigrams"
+        constraints = [models.UniqueConstraint(fields=["item", "gram"], name="unique_item_trigram")]
+        indexes = [models.Index(fields=["gram", "item"])]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.gram!r}"
+
+
+class AutocompleteEntry(models.Model):
+    """
+    Case-folded prefix keys for the public autocomplete endpoint (see autocomplete.py).
+    Rewritten whenever an item's title, platform or item_code changes.
+    """
+
+    KIND_CHOICES = [
+        ("title", "Title"),
+        ("platform", "Platform"),
+        ("code", "Item Code"),
+    ]
+
+    item = models.ForeignKey(CollectionItem, on_delete=models.CASCADE, related_name="autocomplete_entries")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255, help_text="Case-folded text matched by prefix")
+    label = models.CharField(max_length=255, help_text="Text shown as the suggestion")
+
+    class Meta:
+        db_table = "autocomplete_entries"
+        indexes = [models.Index(fields=["key"])]
+
+    def __str__(self):
+        return f"{self.kind}: {self.key}"
+
+
+# Stay well under SQLite's bound-parameter limit in id__in lookups.
+ID_CHUNK_SIZE = 900
+
+
+class ItemHistoryManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert events with their per-item seq numbers and advance the ItemLatestEvent snapshots."""
+        objs = list(objs)
+        if not objs:
+            return objs
+        with transaction.atomic(savepoint=False):
+            snapshots = ItemLatestEvent.lock_for_items({obj.item_id for obj in objs})
+            for obj in objs:
+                snapshots[obj.item_id].last_seq += 1
+                obj.seq = snapshots[obj.item_id].last_seq
+            objs = super().bulk_create(objs, *args, **kwargs)
+            ItemLatestEvent.advance(snapshots, objs)
+        return objs
+
+    def record_many(self, events, batch_size=None):
+        """
+        Write many history events at once.
+
+        Events are inserted with one bulk_create and their side effects are applied
+        set-based: location projections (see project_locations), daily rollups and
+        cache invalidation. Prefer this to creating events one by one, which runs
+        the post_save projection per row, or to a bare bulk_create, which skips it.
+
+        In-memory item instances attached to the events are not refreshed.
+
+        Returns:
+            list: the created ItemHistory events
         """
-        from .utils import get_current_location
+        events = list(events)
+        if not events:
+            return []
+        with transaction.atomic():
+            events = self.bulk_create(events, batch_size=batch_size)
+            DailyRollup.record(DailyRollup.HISTORY_EVENTS, [(event.created_at, event.event_type) for event in events])
+            self.project_locations(events)
+        return events
 
-        location = get_current_location(self.id)
-        if location:
-            self.current_location = location
-            self.is_on_floor = location.location_type == "FLOOR"
-            self.save(update_fields=["current_location", "is_on_floor", "updated_at"])
+    def project_locations(self, events):
+        """
+        Apply saved location-changing events to their items with one UPDATE per destination.
+
+        Only the latest event per item counts, and only if it is not older than the
+        event the item already reflects (location_event_at). Location counters, the
+        scan cache and the catalogue cache are updated to match.
+
+        Returns:
+            int: number of items the events were applied to
+        """
+        latest = {}
+        for event in events:
+            if event.event_type not in LOCATION_CHANGING_EVENTS:
+                continue
+            previous = latest.get(event.item_id)
+            if previous is None or event.created_at >= previous.created_at:
+                latest[event.item_id] = event
+        if not latest:
+            return 0
+
+        item_ids = list(latest)
+        rows = []
+        for start in range(0, len(item_ids), ID_CHUNK_SIZE):
+            rows.extend(
+                CollectionItem.objects.select_for_update()
+                .filter(id__in=item_ids[start : start + ID_CHUNK_SIZE])
+                .order_by()
+                .values_list("id", "current_location_id", "location_event_at", "item_code")
+            )
+
+        # {to_location_id: [(item id, its event time)]}; None only stamps location_event_at.
+        groups = {}
+        deltas = Counter()
+        codes = []
+        for item_id, location_id, applied_at, item_code in rows:
+            event = latest[item_id]
+            if applied_at is not None and event.created_at < applied_at:
+                continue
+            groups.setdefault(event.to_location_id, []).append((item_id, event.created_at))
+            if event.to_location_id is not None and event.to_location_id != location_id:
+                deltas[location_id] -= 1
+                deltas[event.to_location_id] += 1
+            codes.append(item_code)
+        if not codes:
+            return 0
+
+        floor_ids = set(
+            Location.objects.filter(id__in=[location_id for location_id in groups if location_id is not None])
+            .filter(location_type="FLOOR")
+            .values_list("id", flat=True)
+        )
+        now = timezone.now()
+        # Each item is stamped with its own event time, which costs three parameters per item.
+        chunk_size = ID_CHUNK_SIZE // 3
+        for location_id, stamps in groups.items():
+            values = {"updated_at": now}
+            if location_id is not None:
+                values.update(current_location_id=location_id, is_on_floor=location_id in floor_ids)
+            for start in range(0, len(stamps), chunk_size):
+                chunk = stamps[start : start + chunk_size]
+                CollectionItem.objects.filter(id__in=[item_id for item_id, _ in chunk]).update(
+                    location_event_at=Case(
+                        *[When(id=item_id, then=Value(applied_at)) for item_id, applied_at in chunk],
+                        output_field=models.DateTimeField(),
+                    ),
+                    **values,
+                )
+
+        # update() bypasses save() and model signals.
+        Location.adjust_counts("item_count", deltas)
+        scan.invalidate_codes(codes)
+        invalidate_catalogue()
+        return len(codes)
 
 
 class ItemHistory(models.Model):
@@ -276,6 +578,9 @@ class ItemHistory(models.Model):
 
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    seq = models.PositiveIntegerField(editable=False, help_text="Per-item event number, in write order (assigned on save)")
+
+    objects = ItemHistoryManager()
 
     class Meta:
         db_table = "item_history"
@@ -284,11 +589,300 @@ class ItemHistory(models.Model):
         indexes = [
             models.Index(fields=["item", "created_at"]),
             models.Index(fields=["event_type"]),
+            # Covers "latest event of these types for an item" lookups.
+            models.Index(fields=["item", "event_type", "seq"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["item", "seq"], name="unique_item_history_seq"),
         ]
 
     def __str__(self):
         return f"{self.item.item_code} - {self.get_event_type_display()} at {self.created_at}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            snapshots = ItemLatestEvent.lock_for_items([self.item_id])
+            snapshots[self.item_id].last_seq += 1
+            self.seq = snapshots[self.item_id].last_seq
+            super().save(*args, **kwargs)
+            ItemLatestEvent.advance(snapshots, [self])
+
+
+class ArchivedItemHistory(models.Model):
+    """
+    Cold storage for ItemHistory events moved out of item_history by the
+    archive_item_history command. Rows keep their original id, seq and created_at,
+    so they merge back into item order and keyset pages unchanged.
+    """
+
+    id = models.BigIntegerField(primary_key=True, help_text="Id of the ItemHistory row this event was archived from")
+    item = models.ForeignKey(CollectionItem, on_delete=models.CASCADE, related_name="archived_history")
+    event_type = models.CharField(max_length=30, choices=ItemHistory.EVENT_TYPE_CHOICES)
+    from_location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    to_location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    movement_request = models.ForeignKey(
+        "movements.ItemMovementRequest", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    acted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    seq = models.PositiveIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "item_history_archive"
+        ordering = ["created_at"]
+        verbose_name_plural = "Archived item histories"
+        indexes = [
+            models.Index(fields=["item", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.item.item_code} - {self.get_event_type_display()} at {self.created_at} (archived)"
+
+
+class ItemLatestEvent(models.Model):
+    """
+    Latest history state per item, maintained whenever events are written.
+
+    last_seq hands out ItemHistory.seq numbers under a row lock, so sequences are
+    gap-free and unambiguous even for events written with the same timestamp.
+    latest_event and latest_location_event answer "current state" lookups with a
+    single primary-key probe.
+    """
+
+    item = models.OneToOneField(
+        CollectionItem, on_delete=models.CASCADE, primary_key=True, related_name="latest_event_snapshot"
+    )
+    last_seq = models.PositiveIntegerField(default=0)
+    latest_event = models.ForeignKey(ItemHistory, on_delete=models.SET_NULL, null=True, related_name="+")
+    latest_location_event = models.ForeignKey(ItemHistory, on_delete=models.SET_NULL, null=True, related_name="+")
+
+    class Meta:
+        db_table = "item_latest_events"
+
+    def __str__(self):
+        return f"Item {self.item_id} @ {self.last_seq}"
+
+    @classmethod
+    def lock_for_items(cls, item_ids):
+        """
+        Return {item_id: snapshot} for the items, locked for update. Snapshots are
+        created for items that have none yet, then locked like the others, so
+        concurrent first writes for an item wait for each other.
+        """
+        item_ids = list(item_ids)
+        snapshots = cls._lock_chunks(item_ids)
+        missing = [item_id for item_id in item_ids if item_id not in snapshots]
+        if missing:
+            # A racing writer may create the same rows first; its insert wins and we lock that.
+            cls.objects.bulk_create([cls(item_id=item_id) for item_id in missing], ignore_conflicts=True)
+            snapshots.update(cls._lock_chunks(missing))
+        return snapshots
+
+    @classmethod
+    def _lock_chunks(cls, item_ids):
+        snapshots = {}
+        for start in range(0, len(item_ids), ID_CHUNK_SIZE):
+            chunk = item_ids[start : start + ID_CHUNK_SIZE]
+            snapshots.update(
+                (snapshot.item_id, snapshot) for snapshot in cls.objects.select_for_update().filter(item_id__in=chunk)
+            )
+        return snapshots
+
+    @classmethod
+    def advance(cls, snapshots, events):
+        """Point snapshots from lock_for_items at the newest of the just-saved events and save them."""
+        for event in sorted(events, key=lambda event: event.seq):
+            snapshot = snapshots[event.item_id]
+            snapshot.latest_event_id = event.pk
+            if event.event_type in LOCATION_CHANGING_EVENTS:
+                snapshot.latest_location_event_id = event.pk
+        cls.objects.bulk_update(list(snapshots.values()), ["last_seq", "latest_event", "latest_location_event"])
+
+    @classmethod
+    def repoint(cls, item_id):
+        """
+        Point an item's snapshot back at its newest remaining events after an event it
+        referenced was deleted (deleting clears the pointer). last_seq is left alone
+        so seq numbers are never reused.
+        """
+        with transaction.atomic():
+            snapshot = (
+                cls.objects.select_for_update()
+                .filter(item_id=item_id)
+                .filter(Q(latest_event__isnull=True) | Q(latest_location_event__isnull=True))
+                .first()
+            )
+            if snapshot is None:
+                return
+            snapshot.latest_event_id = cls._newest_event_id(item_id)
+            snapshot.latest_location_event_id = cls._newest_event_id(item_id, LOCATION_CHANGING_EVENTS)
+            snapshot.save(update_fields=["latest_event", "latest_location_event"])
+
+    @staticmethod
+    def _newest_event_id(item_id, event_types=None):
+        """
+        Id of the item's highest-seq event (of event_types, if given). An archived event
+        that is newer than every remaining one is moved back into item_history, since
+        snapshot pointers always stay there.
+        """
+        hot = ItemHistory.objects.filter(item_id=item_id)
+        cold = ArchivedItemHistory.objects.filter(item_id=item_id)
+        if event_types is not None:
+            hot = hot.filter(event_type__in=event_types)
+            cold = cold.filter(event_type__in=event_types)
+        newest = hot.order_by("-seq").values_list("id", "seq").first()
+        archived = cold.order_by("-seq").first()
+        if archived is None or (newest is not None and newest[1] > archived.seq):
+            return newest[0] if newest else None
+
+        fields = [field.attname for field in ItemHistory._meta.concrete_fields]
+        # The queryset's bulk_create, not the manager's: the event keeps its seq and is not re-projected.
+        ItemHistory.objects.get_queryset().bulk_create([ItemHistory(**{name: getattr(archived, name) for name in fields})])
+        restored_id = archived.id
+        archived.delete()
+        return restored_id
+
+
+class DailyRollup(models.Model):
+    """
+    Materialized per-day counts for admin time-series charts.
+    - items_added: new items per day, by item_type
+    - history_events: history events per day, by event_type
+
+    Incremented as items and events are created; rebuild() recomputes a date range.
+    Days are local dates in settings.TIME_ZONE.
+    """
+
+    ITEMS_ADDED = "items_added"
+    HISTORY_EVENTS = "history_events"
+
+    METRIC_CHOICES = [
+        (ITEMS_ADDED, "Items Added"),
+        (HISTORY_EVENTS, "History Events"),
+    ]
+
+    day = models.DateField()
+    metric = models.CharField(max_length=30, choices=METRIC_CHOICES)
+    dimension = models.CharField(max_length=30, blank=True, help_text="item_type or event_type")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "daily_rollups"
+        ordering = ["day"]
+        constraints = [models.UniqueConstraint(fields=["metric", "day", "dimension"], name="unique_daily_rollup")]
+
+    def __str__(self):
+        return f"{self.day} {self.metric}:{self.dimension} = {self.count}"
+
+    @classmethod
+    def record(cls, metric, events):
+        """Count (timestamp, dimension) pairs into the metric's daily rows."""
+        cls.increment(metric, Counter((timezone.localdate(timestamp), dimension) for timestamp, dimension in events))
+
+    @classmethod
+    def increment(cls, metric, deltas):
+        """
+        Apply {(day, dimension): delta} increments to a metric.
+        Issues one UPDATE per distinct key, inserting rows that don't exist yet.
+        """
+        for (day, dimension), delta in deltas.items():
+            if not delta:
+                continue
+            rows = cls.objects.filter(metric=metric, day=day, dimension=dimension)
+            if rows.update(count=F("count") + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(metric=metric, day=day, dimension=dimension, count=delta)
+            except IntegrityError:
+                # Created concurrently since the UPDATE; add to it instead.
+                rows.update(count=F("count") + delta)
+
+    @classmethod
+    def rebuild(cls, since=None):
+        """
+        Recompute rollups for every day from since (a date; all days if None) from
+        collection_items, item_history and item_history_archive. Returns the number
+        of rows written.
+        """
+        sources = [
+            (cls.ITEMS_ADDED, CollectionItem.objects.all(), "item_type"),
+            (cls.HISTORY_EVENTS, ItemHistory.objects.all(), "event_type"),
+            (cls.HISTORY_EVENTS, ArchivedItemHistory.objects.all(), "event_type"),
+        ]
+        with transaction.atomic():
+            rollups = cls.objects.all()
+            if since is not None:
+                rollups = rollups.filter(day__gte=since)
+            rollups.delete()
+
+            counts = Counter()
+            for metric, queryset, field in sources:
+                if since is not None:
+                    queryset = queryset.filter(
+                        created_at__gte=timezone.make_aware(datetime.combine(since, datetime.min.time()))
+                    )
+                grouped = queryset.order_by().annotate(day=TruncDate("created_at")).values("day", field)
+                for row in grouped.annotate(count=Count("id")):
+                    counts[metric, row["day"], row[field]] += row["count"]
+            rows = [
+                cls(metric=metric, day=day, dimension=dimension, count=count)
+                for (metric, day, dimension), count in counts.items()
+            ]
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class ExportJob(models.Model):
+    """
+    A CSV export of collection items built in the background.
+    Jobs are created by the export-jobs endpoint and processed by the
+    run_export_jobs management command, which writes the file under EXPORT_ROOT.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    # Same keys as the export endpoint's query parameters
+    filters = models.JSONField(default=dict, blank=True)
+    filters_hash = models.CharField(max_length=64)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="export_jobs",
+    )
+
+    file_path = models.CharField(max_length=500, blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "export_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["filters_hash", "status"]),
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Export #{self.id} ({self.get_status_display()})"
+
 
 @receiver(post_save, sender=ItemHistory)
 def update_item_location_on_history_change(sender, instance, created, **kwargs):
@@ -300,7 +894,113 @@ def update_item_location_on_history_change(sender, instance, created, **kwargs):
         # Use try/except to prevent cascading failures
         try:
             item: CollectionItem = instance.item
-            item.update_location_from_history()
+            item.apply_location_event(instance)
         except Exception as e:
             # Log error but don't raise to prevent disrupting the original save
             logger.error(f"Failed to update item location for item {instance.item_id}: {e}")
+
+
+@receiver(post_delete, sender=ItemHistory)
+def repoint_latest_event_on_history_delete(sender, instance, **kwargs):
+    """Keep the item's ItemLatestEvent pointing at an existing event when history is deleted."""
+    origin = kwargs.get("origin")
+    if isinstance(origin, CollectionItem) or getattr(origin, "model", None) is CollectionItem:
+        # The item, its snapshot and its archived events are going too.
+        return
+    ItemLatestEvent.repoint(instance.item_id)
+
+
+@receiver(post_save, sender=CollectionItem)
+def record_item_added_rollup(sender, instance, created, **kwargs):
+    """Count new items in the daily rollups."""
+    if created:
+        DailyRollup.record(DailyRollup.ITEMS_ADDED, [(instance.created_at, instance.item_type)])
+
+
+@receiver(post_save, sender=ItemHistory)
+def record_history_event_rollup(sender, instance, created, **kwargs):
+    """Count new history events in the daily rollups."""
+    if created:
+        DailyRollup.record(DailyRollup.HISTORY_EVENTS, [(instance.created_at, instance.event_type)])
+
+
+@receiver(post_save, sender=CollectionItem)
+def sync_search_index_on_item_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the full-text index in sync with searchable item fields.
+    Saves limited to non-searchable fields (e.g. location updates) are skipped.
+    """
+    if update_fields is not None and not set(update_fields) & set(search.SEARCH_FIELDS):
+        return
+    search.index_item(instance)
+
+
+@receiver(post_save, sender=CollectionItem)
+def sync_trigram_index_on_item_save(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the fuzzy-search trigram index in sync with title and platform."""
+    if update_fields is not None and not set(update_fields) & set(search.TRIGRAM_FIELDS):
+        return
+    search.index_item_trigrams(instance)
+
+
+@receiver(post_save, sender=CollectionItem)
+def sync_autocomplete_index_on_item_save(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the autocomplete prefix index in sync with title, platform and item_code."""
+    if update_fields is not None and not set(update_fields) & set(autocomplete.AUTOCOMPLETE_FIELDS):
+        return
+    autocomplete.index_item(instance)
+
+
+@receiver(post_delete, sender=CollectionItem)
+def remove_item_from_search_index(sender, instance, **kwargs):
+    """Drop deleted items from the full-text index."""
+    search.unindex_item(instance.pk)
+
+
+@receiver(post_save, sender=CollectionItem)
+@receiver(post_delete, sender=CollectionItem)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Box)
+@receiver(post_delete, sender=Box)
+def invalidate_catalogue_on_change(sender, **kwargs):
+    """Drop cached public catalogue responses when catalogue data changes."""
+    invalidate_catalogue()
+
+
+@receiver(post_save, sender=ItemHistory)
+def invalidate_catalogue_on_location_event(sender, instance, created, **kwargs):
+    """Location-changing history events move items, which changes catalogue responses."""
+    if created and instance.event_type in LOCATION_CHANGING_EVENTS:
+        invalidate_catalogue()
+
+
+# Item/box fields that appear in scan cache entries.
+SCAN_FIELDS = {"item_code", "box_code", "current_location", "location", "box", "status"}
+
+
+@receiver(post_save, sender=CollectionItem)
+@receiver(post_delete, sender=CollectionItem)
+@receiver(post_save, sender=Box)
+@receiver(post_delete, sender=Box)
+def invalidate_scan_cache_on_change(sender, instance, update_fields=None, **kwargs):
+    """Drop cached scan resolutions for items and boxes that changed."""
+    if update_fields is not None and not set(update_fields) & SCAN_FIELDS:
+        return
+    code_field = "item_code" if sender is CollectionItem else "box_code"
+    code = getattr(instance, code_field)
+    scan.invalidate_codes([code, getattr(instance, f"_loaded_{code_field}", None)])
+    setattr(instance, f"_loaded_{code_field}", code)
+
+
+@receiver(pre_delete, sender=Box)
+def invalidate_scan_cache_for_unboxed_items(sender, instance, **kwargs):
+    """Deleting a box clears box on its items without saving them."""
+    scan.invalidate_codes(instance.items.values_list("item_code", flat=True))
+
+
+@receiver(post_delete, sender=CollectionItem)
+@receiver(post_delete, sender=Box)
+def decrement_location_counter_on_delete(sender, instance, **kwargs):
+    """Deleted boxes and items no longer count towards their location."""
+    Location.adjust_counts(sender.location_counter, {getattr(instance, f"{sender.location_field}_id"): -1})
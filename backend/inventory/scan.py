@@ -0,0 +1,74 @@
+"""
+Barcode resolution cache for scan endpoints.
+
+Scanned codes are resolved to a small tuple of item (or box) state and cached
+in the Django cache, shared between worker processes, with one entry per code,
+so a repeat scan costs a single cache read. Writes to items and boxes delete
+just the affected codes' entries. Only codes missing from the cache are read
+from the database. Unknown codes are not cached.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _cache_key(code):
+    # Codes are free-form scanner input; hash them into a backend-safe key.
+    return f"scan:code:{hashlib.sha256(code.encode('utf-8')).hexdigest()}"
+
+
+def load_code(code):
+    """Resolve a code from the database: items first, then boxes. Returns None if unknown."""
+    from .models import Box, CollectionItem
+
+    item = (
+        CollectionItem.objects.filter(item_code=code)
+        .values("id", "current_location_id", "box_id", "status")
+        .order_by()
+        .first()
+    )
+    if item is not None:
+        return {"type": "item", **item}
+    box = Box.objects.filter(box_code=code).values("id", "location_id").order_by().first()
+    if box is not None:
+        return {"type": "box", **box}
+    return None
+
+
+def resolve_code(code):
+    """
+    Resolve a scanned item or box code.
+
+    Returns:
+        dict or None: {"type": "item", "id", "current_location_id", "box_id", "status"},
+        {"type": "box", "id", "location_id"}, or None if the code is unknown.
+    """
+    key = _cache_key(code)
+    entry = cache.get(key)
+    if entry is None:
+        entry = load_code(code)
+        if entry is None:
+            return None
+        cache.set(key, entry, settings.SCAN_CACHE_TIMEOUT)
+    return entry
+
+
+def _invalidate_now(codes):
+    cache.delete_many([_cache_key(code) for code in codes])
+
+
+def invalidate_codes(codes):
+    """
+    Drop cached resolutions for the given item/box codes.
+
+    Runs immediately and again once the surrounding transaction commits, so an
+    entry cached from pre-commit state is dropped too.
+    """
+    codes = {code for code in codes if code}
+    if not codes:
+        return
+    _invalidate_now(codes)
+    transaction.on_commit(lambda: _invalidate_now(codes))
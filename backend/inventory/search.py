@@ -0,0 +1,295 @@
+"""
+Full-text search index for the public catalogue.
+
+SQLite uses an FTS5 table (collection_items_fts) keyed by the item id and kept
+in sync from the CollectionItem save/delete signals. PostgreSQL uses a GIN
+expression index over the same tsvector expression, which the database keeps
+in sync on its own. Other backends fall back to DRF's LIKE-based search.
+
+Typo-tolerant (?fuzzy=true) search uses a separate trigram table
+(ItemTrigram) over title and platform, maintained the same way on every backend.
+"""
+
+import math
+import re
+
+from django.db import connection
+from django.db.models import Count, F, FloatField, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+FTS_TABLE = "collection_items_fts"
+
+# Columns indexed for full-text search, in the order they are stored.
+SEARCH_FIELDS = ["title", "description", "item_code"]
+
+# Fields whose trigrams are indexed for fuzzy search.
+TRIGRAM_FIELDS = ["title", "platform"]
+
+# Share of the query's trigrams an item must contain to be a fuzzy match.
+FUZZY_MIN_MATCH = 0.5
+
+POSTGRES_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(collection_items.title, '') || ' ' || "
+    "coalesce(collection_items.description, '') || ' ' || coalesce(collection_items.item_code, ''))"
+)
+
+
+def is_supported(conn=None):
+    """Return True when the database backend has a full-text index we can use."""
+    return (conn or connection).vendor in ("sqlite", "postgresql")
+
+
+def build_fts5_query(terms):
+    """
+    Turn user search terms into an FTS5 MATCH expression.
+
+    Each term is quoted (so FTS5 operators in user input are treated literally)
+    and prefix-matched, and terms are ANDed, mirroring SearchFilter semantics.
+    """
+    quoted = []
+    for term in terms:
+        term = term.replace('"', '""').strip()
+        if term:
+            quoted.append(f'"{term}"*')
+    return " ".join(quoted)
+
+
+def build_tsquery(terms):
+    """Turn user search terms into a prefix-matching PostgreSQL tsquery string."""
+    lexemes = []
+    for term in terms:
+        cleaned = "".join(ch for ch in term if ch.isalnum())
+        if cleaned:
+            lexemes.append(f"{cleaned}:*")
+    return " & ".join(lexemes)
+
+
+def create_index(schema_editor):
+    """Create the full-text index for the current backend (used by migrations)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({', '.join(SEARCH_FIELDS)})")
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS collection_items_search_idx "
+            f"ON collection_items USING GIN (({POSTGRES_SEARCH_VECTOR}))"
+        )
+
+
+def drop_index(schema_editor):
+    """Drop the full-text index for the current backend (used by migrations)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS collection_items_search_idx")
+
+
+def rebuild_index(conn=None):
+    """
+    Repopulate the full-text index from collection_items in one statement.
+
+    Returns the number of indexed rows, or None if the backend maintains the
+    index itself (PostgreSQL) or has no full-text support.
+    """
+    conn = conn or connection
+    if conn.vendor != "sqlite":
+        return None
+    columns = ", ".join(SEARCH_FIELDS)
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, {columns}) SELECT id, {columns} FROM collection_items")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def index_item(item):
+    """Write (or overwrite) one item's row in the full-text index."""
+    if connection.vendor != "sqlite":
+        return
+    placeholders = ", ".join(["%s"] * (len(SEARCH_FIELDS) + 1))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [item.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)}) VALUES ({placeholders})",
+            [item.pk] + [getattr(item, field) or "" for field in SEARCH_FIELDS],
+        )
+
+
+def index_items(item_ids):
+    """Write the full-text rows for many items with set-based statements."""
+    item_ids = list(item_ids)
+    if connection.vendor != "sqlite" or not item_ids:
+        return
+    columns = ", ".join(SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        # Stay well under SQLite's bound-parameter limit.
+        for start in range(0, len(item_ids), 900):
+            chunk = item_ids[start : start + 900]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) SELECT id, {columns} FROM collection_items "
+                f"WHERE id IN ({placeholders})",
+                chunk,
+            )
+
+
+def unindex_item(item_id):
+    """Remove one item from the full-text index."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [item_id])
+
+
+def search_queryset(queryset, terms):
+    """
+    Restrict a CollectionItem queryset to full-text matches, ordered by relevance.
+
+    The match is resolved by the index (no LIKE scans); the rank is only
+    computed for matching rows.
+    """
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        match = build_fts5_query(terms)
+        if not match:
+            return queryset
+        queryset = queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,)))
+        # bm25() is lower for better matches.
+        rank = RawSQL(
+            f"SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = collection_items.id",
+            (match,),
+        )
+        return queryset.annotate(search_rank=rank).order_by(F("search_rank").asc(), "-created_at")
+
+    tsquery = build_tsquery(terms)
+    if not tsquery:
+        return queryset
+    queryset = queryset.filter(
+        id__in=RawSQL(
+            f"SELECT id FROM collection_items WHERE {POSTGRES_SEARCH_VECTOR} @@ to_tsquery('simple', %s)", (tsquery,)
+        )
+    )
+    rank = RawSQL(f"ts_rank({POSTGRES_SEARCH_VECTOR}, to_tsquery('simple', %s))", (tsquery,))
+    return queryset.annotate(search_rank=rank).order_by(F("search_rank").desc(), "-created_at")
+
+
+def trigrams(text):
+    """
+    Return the set of trigrams in text.
+
+    Like pg_trgm, text is lowercased and split into words, and each word is padded
+    with two leading spaces and one trailing space, so "Zelda" gives
+    {"  z", " ze", "zel", "eld", "lda", "da "}.
+    """
+    grams = set()
+    for word in re.findall(r"\w+", (text or "").casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def item_trigrams(item):
+    """Trigrams indexed for an item (or a dict of its TRIGRAM_FIELDS values)."""
+    get = item.get if isinstance(item, dict) else lambda field: getattr(item, field)
+    return trigrams(" ".join(get(field) or "" for field in TRIGRAM_FIELDS))
+
+
+def index_item_trigrams(item):
+    """Replace one item's rows in the trigram index."""
+    from .models import ItemTrigram
+
+    ItemTrigram.objects.filter(item_id=item.pk).delete()
+    ItemTrigram.objects.bulk_create([ItemTrigram(item_id=item.pk, gram=gram) for gram in item_trigrams(item)])
+
+
+def index_trigrams(item_ids):
+    """Replace the trigram rows of many items with set-based statements."""
+    from .models import CollectionItem, ItemTrigram
+
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), 900):
+        chunk = item_ids[start : start + 900]
+        rows = CollectionItem.objects.filter(id__in=chunk).values("id", *TRIGRAM_FIELDS)
+        ItemTrigram.objects.filter(item_id__in=chunk).delete()
+        ItemTrigram.objects.bulk_create(
+            [ItemTrigram(item_id=row["id"], gram=gram) for row in rows for gram in item_trigrams(row)],
+            batch_size=1000,
+        )
+
+
+def rebuild_trigram_index(chunk_size=2000):
+    """Repopulate the whole trigram index from collection_items; returns the number of items indexed."""
+    from .models import CollectionItem, ItemTrigram
+
+    ItemTrigram.objects.all().delete()
+    indexed = 0
+    batch = []
+    for row in CollectionItem.objects.order_by().values("id", *TRIGRAM_FIELDS).iterator(chunk_size=chunk_size):
+        batch.extend(ItemTrigram(item_id=row["id"], gram=gram) for gram in item_trigrams(row))
+        indexed += 1
+        if len(batch) >= chunk_size:
+            ItemTrigram.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+    ItemTrigram.objects.bulk_create(batch, batch_size=1000)
+    return indexed
+
+
+def fuzzy_search_queryset(queryset, text, min_match=FUZZY_MIN_MATCH):
+    """
+    Restrict a CollectionItem queryset to items sharing most of text's trigrams.
+
+    Candidates are found through the trigram index (only items sharing at least
+    min_match of the query's trigrams); only they are scored. Results are ordered
+    by the share of query trigrams matched, then by trigram similarity
+    (shared / union), so "zelda ocarnia" still finds "The Legend of Zelda: Ocarina of Time".
+    """
+    from .models import ItemTrigram
+
+    grams = trigrams(text)
+    if not grams:
+        return queryset
+    min_shared = max(1, math.ceil(len(grams) * min_match))
+
+    matches = ItemTrigram.objects.filter(gram__in=grams)
+    candidates = matches.values("item").annotate(shared=Count("id")).filter(shared__gte=min_shared).values("item")
+    shared = matches.filter(item=OuterRef("pk")).values("item").annotate(count=Count("id")).values("count")
+    total = ItemTrigram.objects.filter(item=OuterRef("pk")).values("item").annotate(count=Count("id")).values("count")
+
+    return (
+        queryset.filter(id__in=candidates)
+        .annotate(shared_trigrams=Subquery(shared), total_trigrams=Subquery(total))
+        .annotate(
+            match_score=Cast("shared_trigrams", FloatField()) / len(grams),
+            similarity=Cast("shared_trigrams", FloatField()) / (len(grams) + F("total_trigrams") - F("shared_trigrams")),
+        )
+        .order_by("-match_score", "-similarity", "-created_at")
+    )
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that answers ?search= from the full-text index, ranked by relevance.
+    With ?fuzzy=true the trigram index is used instead, tolerating typos.
+
+    Falls back to the default LIKE-based search on backends without an index.
+    """
+
+    fuzzy_param = "fuzzy"
+
+    def is_fuzzy(self, request):
+        return request.query_params.get(self.fuzzy_param, "").strip().lower() in ("true", "1", "yes")
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if terms and self.is_fuzzy(request):
+            return fuzzy_search_queryset(queryset, " ".join(terms))
+
+        if not is_supported():
+            return super().filter_queryset(request, queryset, view)
+        if not terms:
+            return queryset
+        return search_queryset(queryset, terms)
@@ -1,6 +1,46 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.reverse import reverse
 from rest_framework.validators import UniqueValidator
-from .models import Box, CollectionItem, Location
+from .bulk import BULK_FILTER_FIELDS
+from .models import Box, CollectionItem, ExportJob, ItemHistory, Location
+
+
+def _parse_field_list(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Lets GET requests choose the shape of a serializer's output.
+
+    - ?fields=id,title,current_location keeps only the listed top-level fields.
+    - Once ?fields= or ?expand= is given, nested objects are rendered compactly
+      unless listed in ?expand=, e.g. ?expand=current_location (see is_expanded).
+
+    Without either parameter the full representation is returned unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expanded_fields = None
+
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        params = request.query_params
+        if "fields" not in params and "expand" not in params:
+            return
+
+        self.expanded_fields = _parse_field_list(params.get("expand"))
+        requested = _parse_field_list(params.get("fields"))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    def is_expanded(self, field_name):
+        """Return True when a nested field should use its full representation."""
+        return self.expanded_fields is None or field_name in self.expanded_fields
 
 
 class LocationSerializer(serializers.ModelSerializer):
@@ -10,8 +50,8 @@ class LocationSerializer(serializers.ModelSerializer):
     """
 
     location_type_display = serializers.CharField(source="get_location_type_display", read_only=True)
-    box_count = serializers.SerializerMethodField()
-    item_count = serializers.SerializerMethodField()
+    box_count = serializers.IntegerField(read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Location
@@ -23,11 +63,50 @@ class LocationSerializer(serializers.ModelSerializer):
             "item_count",
         ]
 
-    def get_box_count(self, obj):
-        return obj.boxes.count()
 
-    def get_item_count(self, obj):
-        return obj.current_items.count()
+class LocationSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact location representation (id and name only).
+    Needs no queries beyond the select_related location.
+    """
+
+    class Meta:
+        model = Location
+        fields = ["id", "name"]
+        read_only_fields = ["id", "name"]
+
+
+class ItemHistorySerializer(serializers.ModelSerializer):
+    """
+    Read-only item history event, from item_history or ArchivedItemHistory.
+    Expects the relations in inventory.utils.ITEM_HISTORY_RELATED_FIELDS to be
+    select_related, so a page of events needs a single query.
+    """
+
+    item_code = serializers.CharField(source="item.item_code", read_only=True)
+    event_type_display = serializers.CharField(source="get_event_type_display", read_only=True)
+    from_location = LocationSummarySerializer(read_only=True)
+    to_location = LocationSummarySerializer(read_only=True)
+    acted_by_name = serializers.CharField(source="acted_by.name", read_only=True, allow_null=True)
+
+    class Meta:
+        model = ItemHistory
+        fields = [
+            "id",
+            "item",
+            "item_code",
+            "seq",
+            "event_type",
+            "event_type_display",
+            "from_location",
+            "to_location",
+            "movement_request",
+            "acted_by",
+            "acted_by_name",
+            "notes",
+            "created_at",
+        ]
+        read_only_fields = fields
 
 
 class BoxSerializer(serializers.ModelSerializer):
@@ -44,19 +123,13 @@ class LocationDetailSerializer(serializers.ModelSerializer):
 
     location_type_display = serializers.CharField(source="get_location_type_display", read_only=True)
     boxes = BoxSerializer(many=True, read_only=True)
-    box_count = serializers.SerializerMethodField()
-    item_count = serializers.SerializerMethodField()
+    box_count = serializers.IntegerField(read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Location
         fields = ["id", "name", "location_type", "location_type_display", "description", "boxes", "box_count", "item_count"]
 
-    def get_box_count(self, obj):
-        return obj.boxes.count()
-
-    def get_item_count(self, obj):
-        return obj.current_items.count()
-
 
 class CollectionItemSummarySerializer(serializers.ModelSerializer):
     class Meta:
@@ -117,13 +190,15 @@ class CollectionItemSerializer(serializers.ModelSerializer):
         ]
 
 
-class PublicCollectionItemSerializer(serializers.ModelSerializer):
+class PublicCollectionItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for public-facing collection items.
     Exposes read-only collection data without internal fields.
+    Supports ?fields= / ?expand= (see SparseFieldsetMixin).
     """
 
     current_location = LocationSerializer(read_only=True)
+
     location_name = serializers.SerializerMethodField()
     box_code = serializers.CharField(source="box.box_code", read_only=True)
 
@@ -162,6 +237,11 @@ class PublicCollectionItemSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if "current_location" in self.fields and not self.is_expanded("current_location"):
+            self.fields["current_location"] = LocationSummarySerializer(read_only=True)
+
     def get_location_name(self, obj):
         """Return the location name as a simple string for frontend compatibility."""
         if obj.current_location:
@@ -169,19 +249,23 @@ class PublicCollectionItemSerializer(serializers.ModelSerializer):
         return None
 
 
-class AdminCollectionItemSerializer(serializers.ModelSerializer):
+class AdminCollectionItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Writable serializer for admin/volunteer create and update.
     Accepts item_code, title, platform, description, current_location (ID), is_public_visible, is_on_floor.
     Returns nested current_location object in responses.
+    Supports ?fields= / ?expand= on GET (see SparseFieldsetMixin).
     """
 
     current_location = serializers.PrimaryKeyRelatedField(queryset=Location.objects.all(), required=True)
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        if instance.current_location:
-            ret["current_location"] = LocationSerializer(instance.current_location).data
+        if "current_location" in ret and instance.current_location:
+            if self.is_expanded("current_location"):
+                ret["current_location"] = LocationSerializer(instance.current_location).data
+            else:
+                ret["current_location"] = LocationSummarySerializer(instance.current_location).data
         return ret
 
     class Meta:
@@ -213,3 +297,90 @@ class AdminCollectionItemSerializer(serializers.ModelSerializer):
             },
             "title": {"required": True},
         }
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Status of a background export job, with a download link once it has completed."""
+
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "status",
+            "filters",
+            "row_count",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != "COMPLETED":
+            return None
+        url = reverse("export-job-download", kwargs={"pk": obj.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class BulkItemChangesSerializer(serializers.Serializer):
+    """Field changes applied by the bulk item update endpoint."""
+
+    box = serializers.PrimaryKeyRelatedField(queryset=Box.objects.all(), allow_null=True, required=False)
+    current_location = serializers.PrimaryKeyRelatedField(queryset=Location.objects.all(), required=False)
+    is_public_visible = serializers.BooleanField(required=False)
+    status = serializers.ChoiceField(choices=CollectionItem.STATUS_CHOICES, required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Provide at least one change.")
+        box = data.get("box")
+        location = data.get("current_location")
+        if box is not None and location is not None and box.location_id != location.id:
+            raise serializers.ValidationError({"current_location": "Must match the location of the target box."})
+        return data
+
+
+class BulkItemUpdateSerializer(serializers.Serializer):
+    """
+    Selects items by 'ids' or by 'filter' (exactly one) and the 'changes' to apply.
+    """
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=5000)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    changes = BulkItemChangesSerializer()
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate_filter(self, value):
+        unknown = sorted(set(value) - set(BULK_FILTER_FIELDS))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unsupported filter fields: {', '.join(unknown)}. Allowed: {', '.join(BULK_FILTER_FIELDS)}."
+            )
+        return value
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Provide exactly one of 'ids' or 'filter'.")
+        return data
+
+
+class ItemLookupSerializer(serializers.Serializer):
+    """Item codes and/or ids to resolve in one batch lookup."""
+
+    MAX_KEYS = 5000
+
+    item_codes = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, data):
+        total = len(data.get("item_codes", [])) + len(data.get("ids", []))
+        if not total:
+            raise serializers.ValidationError("Provide 'item_codes' and/or 'ids'.")
+        if total > self.MAX_KEYS:
+            raise serializers.ValidationError(f"At most {self.MAX_KEYS} item codes and ids per lookup.")
+        return data
@@ -0,0 +1,105 @@
+"""
+Dashboard statistics.
+
+All figures come from two queries: one conditional aggregation over
+collection_items and one read of the per-location box/item counters.
+
+Results are cached with stale-while-revalidate semantics. An entry is fresh for
+DASHBOARD_STATS_FRESH_SECONDS and while the catalogue version is unchanged.
+After that it is stale but still served for up to DASHBOARD_STATS_STALE_SECONDS
+while a single request, holding a cache lock, recomputes it. Everyone else gets
+the stale figures instead of piling onto the database.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cache import get_catalogue_version
+from .models import CollectionItem, Location
+
+DASHBOARD_STATS_KEY = "dashboard:stats"
+DASHBOARD_STATS_LOCK_KEY = "dashboard:stats:lock"
+
+# How long a recompute may hold the lock, and how long a cold request waits for another's recompute.
+LOCK_TIMEOUT = 30
+COLD_WAIT_SECONDS = 5
+COLD_POLL_INTERVAL = 0.05
+
+
+def compute_dashboard_stats():
+    """Compute every dashboard figure with two queries."""
+    aggregates = {
+        "total_items": Count("id"),
+        "items_on_floor": Count("id", filter=Q(is_on_floor=True)),
+        "public_items": Count("id", filter=Q(is_public_visible=True)),
+    }
+    for value, _ in CollectionItem.ITEM_TYPE_CHOICES:
+        aggregates[f"type:{value}"] = Count("id", filter=Q(item_type=value))
+    for value, _ in CollectionItem.STATUS_CHOICES:
+        aggregates[f"status:{value}"] = Count("id", filter=Q(status=value))
+    counts = CollectionItem.objects.aggregate(**aggregates)
+
+    locations = list(Location.objects.order_by("name").values("id", "name", "location_type", "box_count", "item_count"))
+
+    return {
+        "total_items": counts["total_items"],
+        # Every box has a location, so the per-location counters add up to the box total.
+        "total_boxes": sum(location["box_count"] for location in locations),
+        "total_locations": len(locations),
+        "items_on_floor": counts["items_on_floor"],
+        "public_items": counts["public_items"],
+        "items_by_type": {value: counts[f"type:{value}"] for value, _ in CollectionItem.ITEM_TYPE_CHOICES},
+        "items_by_status": {value: counts[f"status:{value}"] for value, _ in CollectionItem.STATUS_CHOICES},
+        "locations": locations,
+        "generated_at": timezone.now().isoformat(),
+    }
+
+
+def _is_fresh(entry, version):
+    return entry["version"] == version and time.time() < entry["fresh_until"]
+
+
+def _recompute(version):
+    data = compute_dashboard_stats()
+    entry = {
+        "data": data,
+        "version": version,
+        "fresh_until": time.time() + settings.DASHBOARD_STATS_FRESH_SECONDS,
+    }
+    cache.set(
+        DASHBOARD_STATS_KEY,
+        entry,
+        settings.DASHBOARD_STATS_FRESH_SECONDS + settings.DASHBOARD_STATS_STALE_SECONDS,
+    )
+    return data
+
+
+def get_dashboard_stats():
+    """Return dashboard statistics from the cache, recomputing them at most once at a time."""
+    version = get_catalogue_version()
+    entry = cache.get(DASHBOARD_STATS_KEY)
+    if entry is not None and _is_fresh(entry, version):
+        return entry["data"]
+
+    if cache.add(DASHBOARD_STATS_LOCK_KEY, 1, LOCK_TIMEOUT):
+        try:
+            return _recompute(version)
+        finally:
+            cache.delete(DASHBOARD_STATS_LOCK_KEY)
+
+    # Someone else is recomputing: serve stale figures if there are any...
+    if entry is not None:
+        return entry["data"]
+
+    # ...otherwise wait briefly for their result rather than recomputing in parallel.
+    deadline = time.monotonic() + COLD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(COLD_POLL_INTERVAL)
+        entry = cache.get(DASHBOARD_STATS_KEY)
+        if entry is not None:
+            return entry["data"]
+    return compute_dashboard_stats()
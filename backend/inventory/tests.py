@@ -1,13 +1,16 @@
 import json
+import time
 import pytest
 
+from django.core.cache import cache
 from django.test import TestCase, Client
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import status
 from rest_framework_simplejwt.tokens import AccessToken
-from inventory.models import Box, CollectionItem, Location, ItemHistory
+from inventory.models import ArchivedItemHistory, Box, CollectionItem, Location, ItemHistory
 from django.utils import timezone
 from datetime import timedelta
+from inventory.cache import CATALOGUE_CHANGED_AT_KEY
 from inventory.utils import get_current_location
 from django.core.management import call_command
 from io import StringIO
@@ -375,6 +378,60 @@ def test_list_search_by_item_code(test_data):
     assert items[0]["item_code"] == "PS2001"
 
 
+@pytest.mark.django_db
+def test_list_search_ranks_by_relevance(client, floor_location):
+    """Items matching the search term more strongly are listed first."""
+    CollectionItem.objects.create(
+        item_code="RANK001",
+        title="Tetris",
+        description="Falling blocks. Zelda fans may also like it.",
+        current_location=floor_location,
+    )
+    CollectionItem.objects.create(
+        item_code="RANK002",
+        title="Zelda",
+        description="Zelda adventure with Zelda",
+        current_location=floor_location,
+    )
+    response = client.get("/api/inventory/public/items/?search=zelda")
+
+    assert response.status_code == status.HTTP_200_OK
+    items = get_items_from_response(response)
+    assert [item["item_code"] for item in items] == ["RANK002", "RANK001"]
+
+
+@pytest.mark.django_db
+def test_list_search_index_follows_item_updates(client, public_item_snes):
+    """Editing or deleting an item keeps the search index in sync."""
+    public_item_snes.title = "Donkey Kong Country"
+    public_item_snes.save()
+
+    assert get_items_from_response(client.get("/api/inventory/public/items/?search=mario")) == []
+    items = get_items_from_response(client.get("/api/inventory/public/items/?search=donkey"))
+    assert [item["item_code"] for item in items] == ["SNES001"]
+
+    public_item_snes.delete()
+    assert get_items_from_response(client.get("/api/inventory/public/items/?search=donkey")) == []
+
+
+@pytest.mark.django_db
+def test_list_search_treats_operators_literally(test_data):
+    """FTS query syntax in user input must not raise errors."""
+    client = test_data["client"]
+    response = client.get('/api/inventory/public/items/?search="mario" OR NEAR(*')
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index_command(public_item_snes):
+    """The rebuild command repopulates the index from the items table."""
+    out = StringIO()
+    call_command("rebuild_search_index", stdout=out)
+
+    assert "Indexed 1 items" in out.getvalue()
+
+
 @pytest.mark.django_db
 def test_list_combines_filters(test_data):
     """Test that multiple filters can be combined."""
@@ -471,6 +528,254 @@ def test_list_pagination(test_data):
     assert set(page1_ids) != set(page2_ids)  # Different items
 
 
+@pytest.mark.django_db
+def test_list_cursor_pagination_walks_all_items(test_data):
+    """Cursor pagination returns every item once, newest first, without a count."""
+    client = test_data["client"]
+    for i in range(5):
+        CollectionItem.objects.create(
+            item_code=f"CUR{i:03d}", title=f"Cursor {i}", current_location=test_data["floor_location"]
+        )
+    expected = list(
+        CollectionItem.objects.filter(is_public_visible=True).order_by("-created_at", "-id").values_list("id", flat=True)
+    )
+
+    seen = []
+    url = "/api/inventory/public/items/?pagination=cursor&page_size=2"
+    while url:
+        data = json.loads(client.get(url).content)
+        assert "count" not in data
+        seen.extend(item["id"] for item in data["results"])
+        url = data["next"]
+    assert seen == expected
+
+    # The previous link of the second page leads back to the first page.
+    first_page = json.loads(client.get("/api/inventory/public/items/?pagination=cursor&page_size=2").content)
+    second_page = json.loads(client.get(first_page["next"]).content)
+    back = json.loads(client.get(second_page["previous"]).content)
+    assert [item["id"] for item in back["results"]] == expected[:2]
+    assert back["previous"] is None
+
+
+@pytest.mark.django_db
+def test_list_cursor_pagination_invalid_cursor_returns_404(client):
+    """A malformed cursor is rejected."""
+    response = client.get("/api/inventory/public/items/?cursor=not-a-cursor")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_internal_list_streams_ndjson(test_data, volunteer_user):
+    """Asking for NDJSON streams every item, hidden ones included, one object per line."""
+    client = test_data["client"]
+    token = get_volunteer_token(client)
+    response = client.get("/api/inventory/items/", HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_ACCEPT="application/x-ndjson")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert {row["item_code"] for row in rows} == set(CollectionItem.objects.values_list("item_code", flat=True))
+    assert rows[0]["current_location"]["name"]
+
+
+@pytest.mark.django_db
+def test_internal_list_ndjson_applies_sparse_fields(test_data, volunteer_user):
+    """?format=ndjson also selects the stream, and ?fields= trims each line."""
+    client = test_data["client"]
+    token = get_volunteer_token(client)
+    response = client.get("/api/inventory/items/?format=ndjson&fields=id,item_code", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert len(rows) == 3
+    assert all(set(row) == {"id", "item_code"} for row in rows)
+
+
+@pytest.mark.django_db
+def test_facets_counts_public_items(test_data):
+    """Facets count only public items, grouped per field."""
+    client = test_data["client"]
+    response = client.get("/api/inventory/public/items/facets/")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = json.loads(response.content)
+    assert data["total"] == 2
+    assert {entry["value"]: entry["count"] for entry in data["platform"]} == {"SNES": 1, "PS2": 1}
+    assert data["item_type"] == [{"value": "SOFTWARE", "label": "Software", "count": 2}]
+    assert {entry["value"]: entry["count"] for entry in data["is_on_floor"]} == {True: 1, False: 1}
+
+
+@pytest.mark.django_db
+def test_facets_respect_filters(test_data):
+    """Facets reflect the search and is_on_floor filters."""
+    client = test_data["client"]
+    data = json.loads(client.get("/api/inventory/public/items/facets/?search=mario").content)
+    assert data["total"] == 1
+    assert data["platform"] == [{"value": "SNES", "label": "SNES", "count": 1}]
+
+    data = json.loads(client.get("/api/inventory/public/items/facets/?is_on_floor=false").content)
+    assert data["platform"] == [{"value": "PS2", "label": "PS2", "count": 1}]
+
+
+@pytest.mark.django_db
+def test_list_response_is_cached(test_data, django_assert_num_queries):
+    """A repeated public list request is served without touching the database."""
+    client = test_data["client"]
+    first = client.get("/api/inventory/public/items/?platform=SNES")
+
+    with django_assert_num_queries(0):
+        second = client.get("/api/inventory/public/items/?platform=SNES&page_size=")
+
+    assert json.loads(first.content) == json.loads(second.content)
+
+
+@pytest.mark.django_db
+def test_cached_responses_invalidated_on_catalogue_changes(test_data, storage_location):
+    """Item, location and history changes invalidate cached list and detail responses."""
+    client = test_data["client"]
+    item = test_data["public_item_snes"]
+    detail_url = f"/api/inventory/public/items/{item.id}/"
+    client.get("/api/inventory/public/items/")
+    client.get(detail_url)
+
+    item.title = "Super Mario World 2"
+    item.save()
+    assert json.loads(client.get(detail_url).content)["title"] == "Super Mario World 2"
+
+    test_data["floor_location"].name = "Renamed Floor"
+    test_data["floor_location"].save()
+    assert json.loads(client.get(detail_url).content)["location_name"] == "Renamed Floor"
+
+    ItemHistory.objects.create(item=item, event_type="ARRIVED", to_location=storage_location)
+    items = get_items_from_response(client.get("/api/inventory/public/items/"))
+    snes_item = next(entry for entry in items if entry["id"] == item.id)
+    assert snes_item["location_name"] == storage_location.name
+
+
+@pytest.mark.django_db
+def test_list_conditional_get_returns_304(test_data, django_assert_num_queries):
+    """An unchanged list answers If-None-Match with 304 without querying or serializing rows."""
+    client = test_data["client"]
+    # Last-Modified is only sent once the second of the latest change has passed.
+    cache.set(CATALOGUE_CHANGED_AT_KEY, time.time() - 60, timeout=None)
+    response = client.get("/api/inventory/public/items/")
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+
+    with django_assert_num_queries(0):
+        not_modified = client.get("/api/inventory/public/items/", HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+
+    other_page = client.get("/api/inventory/public/items/?platform=SNES", HTTP_IF_NONE_MATCH=etag)
+    assert other_page.status_code == status.HTTP_200_OK
+
+    test_data["public_item_ps2"].title = "Final Fantasy X-2"
+    test_data["public_item_ps2"].save()
+    changed = client.get("/api/inventory/public/items/", HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_locations_conditional_get(client, volunteer_user, floor_location, storage_location):
+    """Location list supports If-None-Match and changes ETag when item counts change."""
+    token = AccessToken.for_user(volunteer_user)
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+    etag = client.get("/api/locations/", **auth)["ETag"]
+
+    assert client.get("/api/locations/", HTTP_IF_NONE_MATCH=etag, **auth).status_code == status.HTTP_304_NOT_MODIFIED
+
+    CollectionItem.objects.create(item_code="ETAG001", title="Counted", current_location=floor_location)
+    assert client.get("/api/locations/", HTTP_IF_NONE_MATCH=etag, **auth).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_if_modified_since_sees_soft_delete(test_data):
+    """Hiding an item is a change for If-Modified-Since even though max(updated_at) does not move."""
+    client = test_data["client"]
+    newest = test_data["public_item_ps2"]
+    CollectionItem.objects.filter(pk=newest.pk).update(updated_at=timezone.now() + timedelta(days=1))
+    cache.set(CATALOGUE_CHANGED_AT_KEY, time.time() - 60, timeout=None)
+    last_modified = client.get("/api/inventory/public/items/")["Last-Modified"]
+    assert client.get("/api/inventory/public/items/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    newest.is_public_visible = False
+    newest.save(update_fields=["is_public_visible"])
+    response = client.get("/api/inventory/public/items/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_200_OK
+    assert newest.id not in [item["id"] for item in response.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_if_modified_since_sees_location_counter_change(client, volunteer_user, floor_location):
+    """A new item changes location item_count, which If-Modified-Since must not hide."""
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(volunteer_user)}"}
+    cache.set(CATALOGUE_CHANGED_AT_KEY, time.time() - 60, timeout=None)
+    last_modified = client.get("/api/locations/", **auth)["Last-Modified"]
+    assert client.get("/api/locations/", HTTP_IF_MODIFIED_SINCE=last_modified, **auth).status_code == 304
+
+    CollectionItem.objects.create(item_code="LM001", title="Counted", current_location=floor_location)
+    response = client.get("/api/locations/", HTTP_IF_MODIFIED_SINCE=last_modified, **auth)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["item_count"] == 1
+
+
+@pytest.mark.django_db
+def test_last_modified_waits_for_its_second_to_pass(test_data):
+    """A change in the current second gets no Last-Modified, so a same-second change cannot be hidden."""
+    response = test_data["client"].get("/api/inventory/public/items/")
+    assert response.has_header("ETag")
+    assert not response.has_header("Last-Modified")
+
+
+@pytest.mark.django_db
+def test_list_sparse_fields_and_compact_location(test_data, django_assert_max_num_queries):
+    """?fields= limits the payload and renders the location compactly without count queries."""
+    client = test_data["client"]
+    for i in range(5):
+        CollectionItem.objects.create(
+            item_code=f"SPARSE{i}", title=f"Sparse {i}", current_location=test_data["floor_location"]
+        )
+
+    # ETag aggregate, pagination COUNT and the page SELECT; nothing per row.
+    with django_assert_max_num_queries(3):
+        response = client.get("/api/inventory/public/items/?fields=id,title,current_location")
+
+    items = get_items_from_response(response)
+    assert set(items[0]) == {"id", "title", "current_location"}
+    assert set(items[0]["current_location"]) == {"id", "name"}
+
+
+@pytest.mark.django_db
+def test_list_expand_keeps_full_location(test_data):
+    """?expand=current_location keeps the full nested location."""
+    client = test_data["client"]
+    items = get_items_from_response(
+        client.get("/api/inventory/public/items/?fields=id,current_location&expand=current_location")
+    )
+
+    assert "item_count" in items[0]["current_location"]
+
+
+@pytest.mark.django_db
+def test_admin_item_list_supports_compact_location(client, volunteer_user, public_item_snes):
+    """The internal item list honours ?fields= as well."""
+    token = AccessToken.for_user(volunteer_user)
+    response = client.get(
+        "/api/inventory/items/?fields=id,item_code,current_location",
+        HTTP_AUTHORIZATION=f"Bearer {token}",
+    )
+
+    items = get_items_from_response(response)
+    assert items[0] == {
+        "id": public_item_snes.id,
+        "item_code": "SNES001",
+        "current_location": {"id": public_item_snes.current_location_id, "name": "Main Floor"},
+    }
+
+
 # ============================================================================
 # TESTS FOR GET /api/public/items/{id}/ (Detail endpoint)
 # ============================================================================
@@ -841,6 +1146,48 @@ class TestGetCurrentLocation:
         """Invalid item_id should return None without raising exception."""
         assert get_current_location(99999) is None
 
+    def test_events_sharing_a_timestamp_resolve_in_write_order(self, item, location_a, location_b, location_c):
+        """Per-item seq breaks created_at ties deterministically."""
+        from inventory.utils import is_item_in_transit
+
+        ItemHistory.objects.record_many(
+            [
+                ItemHistory(item=item, event_type="INITIAL", to_location=location_a),
+                ItemHistory(item=item, event_type="ARRIVED", to_location=location_c),
+                ItemHistory(item=item, event_type="VERIFIED", to_location=location_b),
+            ]
+        )
+        ItemHistory.objects.create(item=item, event_type="IN_TRANSIT", to_location=location_a)
+        ItemHistory.objects.filter(item=item).update(created_at=timezone.now())
+
+        assert list(ItemHistory.objects.filter(item=item).order_by("seq").values_list("seq", flat=True)) == [1, 2, 3, 4]
+        assert get_current_location(item.id) == location_b
+        assert is_item_in_transit(item.id)
+
+    def test_deleting_latest_events_repoints_the_snapshot(self, item, location_a, location_b):
+        from inventory.utils import is_item_in_transit
+
+        ItemHistory.objects.create(item=item, event_type="INITIAL", to_location=location_a)
+        in_transit = ItemHistory.objects.create(item=item, event_type="IN_TRANSIT", to_location=location_b)
+        correction = ItemHistory.objects.create(item=item, event_type="LOCATION_CORRECTION", to_location=location_b)
+
+        correction.delete()
+        assert get_current_location(item.id) == location_a
+        assert is_item_in_transit(item.id)
+
+        in_transit.delete()
+        assert not is_item_in_transit(item.id)
+        assert ItemHistory.objects.create(item=item, event_type="VERIFIED", to_location=location_b).seq == 4
+
+    def test_latest_state_lookups_are_single_queries(self, item, location_a, django_assert_num_queries):
+        from inventory.utils import is_item_in_transit
+
+        ItemHistory.objects.create(item=item, event_type="INITIAL", to_location=location_a)
+        with django_assert_num_queries(1):
+            assert get_current_location(item.id).name == location_a.name
+        with django_assert_num_queries(1):
+            assert not is_item_in_transit(item.id)
+
     def test_complex_workflow_flow(self, item, location_a, location_b, location_c):
         """Test realistic workflow with mixed event types."""
         base_time = timezone.now()
@@ -964,6 +1311,117 @@ class ItemLocationTest(TestCase):
         self.assertEqual(self.item.current_location, original_location)
         self.assertEqual(self.item.is_on_floor, original_is_on_floor)
 
+    def test_signal_applies_event_without_reading_history(self):
+        """The new event is projected onto the item directly; history is not re-queried."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            event = ItemHistory.objects.create(
+                item=self.item,
+                event_type="LOCATION_CORRECTION",
+                from_location=self.location_storage,
+                to_location=self.location_floor,
+            )
+
+        history_reads = [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and "item_history" in q["sql"]
+        ]
+        self.assertEqual(history_reads, [])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_location, self.location_floor)
+        self.assertTrue(self.item.is_on_floor)
+        self.assertEqual(self.item.location_event_at, event.created_at)
+
+    def test_older_event_does_not_move_item_back(self):
+        """Events older than the last applied one are ignored until a repair recomputes from history."""
+        self.item.location_event_at = timezone.now() + timedelta(hours=1)
+        self.item.save(update_fields=["location_event_at"])
+
+        ItemHistory.objects.create(item=self.item, event_type="LOCATION_CORRECTION", to_location=self.location_floor)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_location, self.location_storage)
+
+        self.item.update_location_from_history()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_location, self.location_floor)
+        self.assertTrue(self.item.is_on_floor)
+
+    def test_record_many_projects_latest_event_per_item(self):
+        """record_many writes events in bulk and applies one projection per item."""
+        other = CollectionItem.objects.create(item_code="TEST002", title="Other", current_location=self.location_storage)
+        events = [
+            ItemHistory(item=self.item, event_type="ARRIVED", to_location=self.location_floor),
+            ItemHistory(item=self.item, event_type="MOVE_REQUESTED", to_location=self.location_storage),
+            ItemHistory(item=other, event_type="ARRIVED", to_location=self.location_floor),
+            ItemHistory(item=other, event_type="LOCATION_CORRECTION", to_location=self.location_storage),
+        ]
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            created = ItemHistory.objects.record_many(events)
+
+        self.assertEqual(len(created), 4)
+        self.assertEqual(sum(1 for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "item_history"')), 1)
+        # One UPDATE per destination, not per event or item.
+        self.assertEqual(sum(1 for q in ctx.captured_queries if q["sql"].startswith('UPDATE "collection_items"')), 2)
+        self.item.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.item.current_location, self.item.is_on_floor), (self.location_floor, True))
+        self.assertEqual((other.current_location, other.is_on_floor), (self.location_storage, False))
+        self.location_storage.refresh_from_db()
+        self.location_floor.refresh_from_db()
+        self.assertEqual((self.location_storage.item_count, self.location_floor.item_count), (1, 1))
+
+    def test_project_locations_stamps_each_item_with_its_own_event_time(self):
+        other = CollectionItem.objects.create(item_code="TEST002", title="Other", current_location=self.location_storage)
+        earlier = timezone.now() - timedelta(days=1)
+        later = timezone.now()
+        events = [
+            ItemHistory(item=self.item, event_type="ARRIVED", to_location=self.location_floor, created_at=earlier),
+            ItemHistory(item=other, event_type="ARRIVED", to_location=self.location_floor, created_at=later),
+        ]
+
+        self.assertEqual(ItemHistory.objects.project_locations(events), 2)
+        self.item.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.item.current_location, self.item.location_event_at), (self.location_floor, earlier))
+        self.assertEqual((other.current_location, other.location_event_at), (self.location_floor, later))
+
+        # An event between the two times is still newer than what self.item reflects.
+        between = ItemHistory(
+            item=self.item,
+            event_type="LOCATION_CORRECTION",
+            to_location=self.location_storage,
+            created_at=earlier + timedelta(hours=1),
+        )
+        self.assertTrue(self.item.apply_location_event(between))
+
+    def test_first_writes_lock_a_created_snapshot(self):
+        from unittest import mock
+
+        from inventory.models import ItemLatestEvent
+
+        ItemHistory.objects.create(item=self.item, event_type="INITIAL", to_location=self.location_storage)
+        # Another writer created the snapshot after this one looked for it.
+        original = ItemLatestEvent._lock_chunks
+        with mock.patch.object(ItemLatestEvent, "_lock_chunks", side_effect=[{}, original([self.item.id])]):
+            snapshots = ItemLatestEvent.lock_for_items([self.item.id])
+        self.assertFalse(snapshots[self.item.id]._state.adding)
+        self.assertEqual(snapshots[self.item.id].last_seq, 1)
+
+        event = ItemHistory.objects.create(item=self.item, event_type="VERIFIED", to_location=self.location_storage)
+        self.assertEqual(event.seq, 2)
+
+    def test_record_many_skips_items_with_newer_projection(self):
+        self.item.location_event_at = timezone.now() + timedelta(hours=1)
+        self.item.save(update_fields=["location_event_at"])
+
+        ItemHistory.objects.record_many([ItemHistory(item=self.item, event_type="ARRIVED", to_location=self.location_floor)])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_location, self.location_storage)
+
 
 class RebuildItemLocationsCommandTest(TestCase):
     """Test the management command."""
@@ -980,6 +1438,40 @@ class RebuildItemLocationsCommandTest(TestCase):
         output = out.getvalue()
         self.assertIn("Updated", output)
 
+    def _drift_items(self):
+        """Give three items floor history, then knock two of them out of sync with it."""
+        floor = Location.objects.create(name="Floor", location_type="FLOOR")
+        items = [
+            CollectionItem.objects.create(item_code=f"DRIFT{i}", title=f"Drift {i}", current_location=self.location)
+            for i in range(3)
+        ]
+        for item in items:
+            ItemHistory.objects.create(item=item, event_type="ARRIVED", to_location=floor)
+        CollectionItem.objects.filter(id__in=[items[0].id, items[2].id]).update(
+            current_location=self.location, is_on_floor=False
+        )
+        return floor, items
+
+    def test_dry_run_reports_drift_without_changes(self):
+        floor, items = self._drift_items()
+        out = StringIO()
+        call_command("rebuild_item_locations", "--dry-run", stdout=out)
+
+        self.assertIn("Checked 3 items: 2 drifted", out.getvalue())
+        self.assertEqual(CollectionItem.objects.filter(current_location=floor).count(), 1)
+
+    def test_set_based_rebuild_repairs_drift_in_batches(self):
+        from inventory.locations import rebuild_item_locations
+
+        floor, items = self._drift_items()
+        result = rebuild_item_locations(batch_size=1, partitions=2)
+
+        self.assertEqual(result, {"checked": 3, "drifted": 2, "updated": 2})
+        self.assertEqual(set(CollectionItem.objects.filter(current_location=floor, is_on_floor=True)), set(items))
+        floor.refresh_from_db()
+        self.assertEqual(floor.item_count, 3)
+        self.assertEqual(rebuild_item_locations(dry_run=True)["drifted"], 0)
+
     def test_command_single_item(self):
         """Test command with specific item ID."""
         out = StringIO()
@@ -989,6 +1481,81 @@ class RebuildItemLocationsCommandTest(TestCase):
         self.assertIn(f"Updated item {self.item.id}", output)
 
 
+class LocationCounterTest(TestCase):
+    """Test the denormalized box/item counters on Location."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="counter@example.com",
+            name="Counter User",
+            password="testpass",
+            role="VOLUNTEER",
+        )
+        self.storage = Location.objects.create(name="Storage C", location_type="STORAGE")
+        self.floor = Location.objects.create(name="Floor C", location_type="FLOOR")
+        self.box = Box.objects.create(box_code="CNT-BOX", location=self.storage)
+        self.boxed_item = CollectionItem.objects.create(
+            item_code="CNT001", title="Boxed", current_location=self.storage, box=self.box
+        )
+        self.loose_item = CollectionItem.objects.create(item_code="CNT002", title="Loose", current_location=self.storage)
+
+    def assertCounts(self, location, box_count, item_count):
+        location.refresh_from_db()
+        self.assertEqual((location.box_count, location.item_count), (box_count, item_count))
+
+    def test_create_move_and_delete_update_counts(self):
+        self.assertCounts(self.storage, 1, 2)
+
+        self.loose_item.current_location = self.floor
+        self.loose_item.save()
+        self.assertCounts(self.storage, 1, 1)
+        self.assertCounts(self.floor, 0, 1)
+
+        self.loose_item.delete()
+        self.box.items.all().update(box=None)
+        self.box.delete()
+        self.assertCounts(self.storage, 0, 1)
+        self.assertCounts(self.floor, 0, 0)
+
+    def test_history_event_and_box_arrival_update_counts(self):
+        ItemHistory.objects.create(item=self.loose_item, event_type="ARRIVED", to_location=self.floor)
+        self.assertCounts(self.storage, 1, 1)
+        self.assertCounts(self.floor, 0, 1)
+
+        self.box.mark_as_arrived(self.floor, user=self.user)
+        self.assertCounts(self.storage, 0, 0)
+        self.assertCounts(self.floor, 1, 2)
+
+    def test_event_on_stale_instance_moves_item_and_counts(self):
+        moved = CollectionItem.objects.get(pk=self.loose_item.pk)
+        ItemHistory.objects.create(item=moved, event_type="ARRIVED", to_location=self.floor)
+
+        # self.loose_item still believes it is in storage.
+        ItemHistory.objects.create(item=self.loose_item, event_type="LOCATION_CORRECTION", to_location=self.storage)
+        item = CollectionItem.objects.get(pk=self.loose_item.pk)
+        self.assertEqual(item.current_location, self.storage)
+        self.assertFalse(item.is_on_floor)
+        self.assertCounts(self.storage, 1, 2)
+        self.assertCounts(self.floor, 0, 0)
+
+    def test_rebuild_counts_repairs_drift(self):
+        Location.objects.update(box_count=99, item_count=99)
+        Location.rebuild_counts()
+        self.assertCounts(self.storage, 1, 2)
+        self.assertCounts(self.floor, 0, 0)
+
+    def test_location_list_does_not_load_items(self):
+        token = AccessToken.for_user(self.user)
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        # Two user lookups (middleware + DRF auth), ETag aggregate, pagination COUNT and the page.
+        with self.assertNumQueries(5):
+            response = client.get("/api/locations/")
+
+        data = json.loads(response.content)
+        storage = next(entry for entry in data["results"] if entry["id"] == self.storage.id)
+        self.assertEqual((storage["box_count"], storage["item_count"]), (1, 2))
+
+
 class BoxEndpointsTest(TestCase):
     """Test box list/detail endpoints and item box assignment."""
 
@@ -1177,6 +1744,9 @@ class TestExportItems:
     def _get_volunteer_token(self):
         return get_volunteer_token(self.client)
 
+    def _read_csv(self, response):
+        return b"".join(response.streaming_content).decode("utf-8")
+
     def test_unauthenticated_returns_401(self):
         """Unauthenticated request should be rejected."""
         response = self.client.get(self.EXPORT_URL)
@@ -1202,7 +1772,7 @@ class TestExportItems:
         """CSV should contain header row and data rows."""
         token = self._get_admin_token()
         response = self.client.get(self.EXPORT_URL, HTTP_AUTHORIZATION=f"Bearer {token}")
-        content = response.content.decode("utf-8")
+        content = self._read_csv(response)
         lines = content.strip().split("\n")
 
         # Header + at least 2 data rows
@@ -1219,7 +1789,7 @@ class TestExportItems:
             f"{self.EXPORT_URL}?record_type=SOFTWARE",
             HTTP_AUTHORIZATION=f"Bearer {token}",
         )
-        content = response.content.decode("utf-8")
+        content = self._read_csv(response)
         assert "EXP001" in content
         assert "EXP002" not in content
 
@@ -1230,7 +1800,7 @@ class TestExportItems:
             f"{self.EXPORT_URL}?box_id={self.box.id}",
             HTTP_AUTHORIZATION=f"Bearer {token}",
         )
-        content = response.content.decode("utf-8")
+        content = self._read_csv(response)
         assert "EXP001" in content  # In the box
         assert "EXP002" not in content  # Not in any box
 
@@ -1242,7 +1812,7 @@ class TestExportItems:
             f"{self.EXPORT_URL}?start_date={today}&end_date={today}",
             HTTP_AUTHORIZATION=f"Bearer {token}",
         )
-        content = response.content.decode("utf-8")
+        content = self._read_csv(response)
         # Items were created today, so they should appear
         assert "EXP001" in content
 
@@ -1254,12 +1824,32 @@ class TestExportItems:
             f"{self.EXPORT_URL}?start_date={future}",
             HTTP_AUTHORIZATION=f"Bearer {token}",
         )
-        content = response.content.decode("utf-8")
+        content = self._read_csv(response)
         lines = content.strip().split("\n")
         # Only header row
         assert len(lines) == 1
         assert "MADE ID" in lines[0]
 
+    def test_response_is_streamed(self):
+        """The export is streamed rather than built in memory."""
+        token = self._get_admin_token()
+        response = self.client.get(self.EXPORT_URL, HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert response.streaming
+        rows = self._read_csv(response).strip().split("\n")
+        assert rows[1].startswith("EXP002,Export Test Console,,Hardware,,Storage Room A,Storage,Yes,Available,")
+
+    def test_end_date_before_creation_excludes_items(self):
+        """end_date is inclusive of its whole day but excludes later items."""
+        token = self._get_admin_token()
+        yesterday = (timezone.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        response = self.client.get(
+            f"{self.EXPORT_URL}?end_date={yesterday}",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        lines = self._read_csv(response).strip().split("\n")
+        assert len(lines) == 1
+        assert "MADE ID" in lines[0]
+
     def test_invalid_start_date_returns_400(self):
         """Invalid date format should return 400."""
         token = self._get_admin_token()
@@ -1277,3 +1867,826 @@ class TestExportItems:
             HTTP_AUTHORIZATION=f"Bearer {token}",
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestExportJobs:
+    """Tests for background export jobs."""
+
+    JOBS_URL = "/api/inventory/export-jobs/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, settings, tmp_path, admin_user, volunteer_user, floor_location, storage_location):
+        settings.EXPORT_ROOT = str(tmp_path)
+        self.client = client
+        self.floor_location = floor_location
+        self.items = [
+            CollectionItem.objects.create(item_code=f"JOB{i:03d}", title=f"Job Item {i}", current_location=floor_location)
+            for i in range(5)
+        ]
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(client)}"}
+
+    def _submit(self, data=None):
+        return self.client.post(self.JOBS_URL, data=json.dumps(data or {}), content_type="application/json", **self.auth)
+
+    def test_job_lifecycle(self):
+        """A queued job is built by the worker command, then polled and downloaded."""
+        response = self._submit()
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = json.loads(response.content)
+        assert job["status"] == "PENDING"
+        assert job["download_url"] is None
+
+        not_ready = self.client.get(f"{self.JOBS_URL}{job['id']}/download/", **self.auth)
+        assert not_ready.status_code == status.HTTP_409_CONFLICT
+
+        out = StringIO()
+        call_command("run_export_jobs", workers=1, stdout=out)
+        assert "wrote 5 rows" in out.getvalue()
+
+        job = json.loads(self.client.get(f"{self.JOBS_URL}{job['id']}/", **self.auth).content)
+        assert job["status"] == "COMPLETED"
+        assert job["row_count"] == 5
+
+        download = self.client.get(job["download_url"], **self.auth)
+        assert download.status_code == status.HTTP_200_OK
+        assert "attachment" in download["Content-Disposition"]
+        lines = b"".join(download.streaming_content).decode("utf-8").strip().splitlines()
+        assert lines[0].startswith("MADE ID,")
+        assert [line.split(",")[0] for line in lines[1:]] == [item.item_code for item in self.items]
+
+    def test_identical_export_reuses_job(self):
+        """Identical filters reuse the queued or finished job instead of queuing new work."""
+        first = json.loads(self._submit({"record_type": "SOFTWARE"}).content)
+        queued = self._submit({"record_type": "SOFTWARE"})
+        assert queued.status_code == status.HTTP_200_OK
+        assert json.loads(queued.content)["id"] == first["id"]
+
+        call_command("run_export_jobs", workers=1, stdout=StringIO())
+        finished = json.loads(self._submit({"record_type": "SOFTWARE"}).content)
+        assert finished["id"] == first["id"]
+        assert finished["status"] == "COMPLETED"
+
+        other = self._submit({"record_type": "HARDWARE"})
+        assert other.status_code == status.HTTP_202_ACCEPTED
+
+    def test_invalid_filters_return_400(self):
+        response = self._submit({"start_date": "not-a-date"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self._submit({"start_date": 20240101}).status_code == status.HTTP_400_BAD_REQUEST
+        assert self._submit({"end_date": ["2024-01-01"]}).status_code == status.HTTP_400_BAD_REQUEST
+        assert self._submit({"record_type": ["SOFTWARE"]}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_stale_running_job_is_not_reused(self):
+        """A job whose worker died is failed by the worker command and not handed out again."""
+        from inventory.models import ExportJob
+
+        first = json.loads(self._submit().content)
+        ExportJob.objects.filter(pk=first["id"]).update(status="RUNNING", started_at=timezone.now() - timedelta(days=30))
+
+        retry = self._submit()
+        assert retry.status_code == status.HTTP_202_ACCEPTED
+        assert json.loads(retry.content)["id"] != first["id"]
+
+        out = StringIO()
+        call_command("run_export_jobs", workers=1, stdout=out)
+        assert "Marked 1 stale running export jobs as failed" in out.getvalue()
+        assert ExportJob.objects.get(pk=first["id"]).status == "FAILED"
+        assert ExportJob.objects.get(pk=json.loads(retry.content)["id"]).status == "COMPLETED"
+
+    def test_partitions_are_merged_in_id_order(self, tmp_path):
+        """Rows written per id range are concatenated into one file in id order."""
+        from inventory.exports import write_export_file
+        from inventory.utils import split_id_range
+
+        ids = [item.id for item in self.items]
+        assert split_id_range(CollectionItem.objects.filter(id__in=ids), 2) == [(ids[0], ids[2]), (ids[3], ids[4])]
+
+        path = tmp_path / "partitioned.csv"
+        assert write_export_file({}, path, workers=1, partitions=3) == 5
+        codes = [line.split(",")[0] for line in path.read_text().strip().splitlines()[1:]]
+        assert codes == [item.item_code for item in self.items]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["partitioned.csv"]
+
+
+@pytest.mark.django_db
+class TestImportItems:
+    """Tests for the bulk item import endpoint and command."""
+
+    IMPORT_URL = "/api/inventory/items/import/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, admin_user, volunteer_user, floor_location, storage_location):
+        self.client = client
+        self.floor_location = floor_location
+        self.storage_location = storage_location
+        self.box = Box.objects.create(box_code="IMPBOX", label="Import Box", location=storage_location)
+        CollectionItem.objects.create(item_code="TAKEN", title="Existing", current_location=floor_location)
+
+    def _post(self, token, **kwargs):
+        return self.client.post(self.IMPORT_URL, HTTP_AUTHORIZATION=f"Bearer {token}", **kwargs)
+
+    def test_csv_import_creates_items_and_history(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        csv_content = (
+            "item_code,title,platform,item_type,location,box\n"
+            "IMP001,Imported Game,SNES,SOFTWARE,Main Floor,\n"
+            "IMP002,Boxed Console,,HARDWARE,,IMPBOX\n"
+        )
+        upload = SimpleUploadedFile("items.csv", csv_content.encode("utf-8"), content_type="text/csv")
+        response = self._post(get_admin_token(self.client), data={"file": upload})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == {"created": 2, "failed": 0, "errors": []}
+
+        game = CollectionItem.objects.get(item_code="IMP001")
+        assert game.current_location == self.floor_location
+        assert game.is_on_floor
+        console = CollectionItem.objects.get(item_code="IMP002")
+        assert console.box == self.box
+        assert console.current_location == self.storage_location
+        assert ItemHistory.objects.filter(item__in=[game, console], event_type="INITIAL").count() == 2
+
+        self.floor_location.refresh_from_db()
+        assert self.floor_location.item_count == 2
+        search_response = self.client.get("/api/inventory/public/items/?search=Imported")
+        assert [item["item_code"] for item in get_items_from_response(search_response)] == ["IMP001"]
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        rows = [
+            {"item_code": "IMP010", "title": "Good Row", "location": self.floor_location.id},
+            {"item_code": "TAKEN", "title": "Duplicate Of Existing", "location": self.floor_location.id},
+            {"item_code": "IMP010", "title": "Duplicate In File", "location": self.floor_location.id},
+            {"item_code": "IMP011", "title": "Bad Type", "item_type": "VINYL", "location": self.floor_location.id},
+            {"item_code": "IMP012", "title": "Nowhere", "location": "Attic"},
+            {"item_code": "IMP013", "title": "Unknown Box", "box": "NOPE"},
+        ]
+        response = self._post(get_admin_token(self.client), data=json.dumps(rows), content_type="application/json")
+
+        data = json.loads(response.content)
+        assert data["created"] == 1
+        assert data["failed"] == 5
+        assert [(error["row"], sorted(error["errors"])) for error in data["errors"]] == [
+            (2, ["item_code"]),
+            (3, ["item_code"]),
+            (4, ["item_type"]),
+            (5, ["location"]),
+            (6, ["box", "location"]),
+        ]
+        assert CollectionItem.objects.filter(item_code__startswith="IMP").count() == 1
+
+    def test_non_scalar_keys_are_row_errors(self):
+        rows = [
+            {"item_code": ["a"], "title": "List Code", "location": "Main Floor"},
+            {"item_code": "IMP020", "title": "Dict Box", "box": {"code": "IMPBOX"}, "location": "Main Floor"},
+            {"item_code": "IMP021", "title": "List Location", "location": [self.floor_location.id]},
+            {"item_code": 22, "title": "Int Code", "box": "IMPBOX"},
+        ]
+        response = self._post(get_admin_token(self.client), data=json.dumps(rows), content_type="application/json")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = json.loads(response.content)
+        assert data["created"] == 1
+        assert [(error["row"], error["item_code"], sorted(error["errors"])) for error in data["errors"]] == [
+            (1, "", ["item_code"]),
+            (2, "IMP020", ["box"]),
+            (3, "IMP021", ["location"]),
+        ]
+        assert CollectionItem.objects.get(item_code="22").box == self.box
+
+    def test_import_uses_set_based_queries(self, django_assert_max_num_queries):
+        from inventory.imports import import_items
+
+        rows = [{"item_code": f"BULK{i:03d}", "title": f"Bulk {i}", "location": "Storage Room A"} for i in range(200)]
+        # Per batch: one code lookup, the chunked item INSERTs (SQLite caps bound parameters), one history
+        # INSERT with its latest-event snapshot writes, the set-based location projection, one counter
+        # UPDATE, the full-text/trigram index writes and the daily rollup upserts - never a query per row.
+        with django_assert_max_num_queries(70):
+            result = import_items(rows, batch_size=100)
+        assert result["created"] == 200
+
+    def test_volunteer_cannot_import(self):
+        response = self._post(get_volunteer_token(self.client), data="[]", content_type="application/json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_import_command(self, tmp_path):
+        path = tmp_path / "items.json"
+        path.write_text(json.dumps([{"item_code": "CMD001", "title": "From File", "location": "Storage Room A"}]))
+        out = StringIO()
+        call_command("import_items", str(path), stdout=out)
+        assert "Imported 1 items, 0 rows failed" in out.getvalue()
+        assert CollectionItem.objects.filter(item_code="CMD001").exists()
+
+
+@pytest.mark.django_db
+class TestBulkUpdateItems:
+    """Tests for the bulk item update endpoint."""
+
+    BULK_URL = "/api/inventory/items/bulk/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, volunteer_user, floor_location, storage_location):
+        self.client = client
+        self.floor_location = floor_location
+        self.storage_location = storage_location
+        self.storage_box = Box.objects.create(box_code="BULKBOX", label="Bulk Box", location=storage_location)
+        self.items = [
+            CollectionItem.objects.create(item_code=f"BLK{i:03d}", title=f"Bulk {i}", current_location=floor_location)
+            for i in range(4)
+        ]
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(client)}"}
+
+    def _patch(self, data):
+        return self.client.patch(self.BULK_URL, data=json.dumps(data), content_type="application/json", **self.auth)
+
+    def test_reboxing_moves_items_and_records_history(self, django_assert_max_num_queries):
+        ids = [item.id for item in self.items[:3]]
+        with django_assert_max_num_queries(24):
+            response = self._patch({"ids": ids, "changes": {"box": self.storage_box.id}})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == {"updated": 3, "moved": 3}
+        moved = CollectionItem.objects.filter(id__in=ids)
+        assert {(item.box_id, item.current_location_id, item.is_on_floor) for item in moved} == {
+            (self.storage_box.id, self.storage_location.id, False)
+        }
+        history = ItemHistory.objects.filter(item_id__in=ids, event_type="LOCATION_CORRECTION")
+        assert history.count() == 3
+        # Each item's projection records the event that moved it.
+        applied_at = {item.id: item.location_event_at for item in moved}
+        assert all(applied_at[event.item_id] == event.created_at for event in history)
+        assert {(event.from_location_id, event.to_location_id) for event in history} == {
+            (self.floor_location.id, self.storage_location.id)
+        }
+
+        self.floor_location.refresh_from_db()
+        self.storage_location.refresh_from_db()
+        assert self.floor_location.item_count == 1
+        assert self.storage_location.item_count == 3
+
+    def test_filter_selection_updates_visibility_without_history(self):
+        response = self._patch(
+            {"filter": {"current_location": self.floor_location.id}, "changes": {"is_public_visible": False}}
+        )
+
+        assert json.loads(response.content) == {"updated": 4, "moved": 0}
+        assert not CollectionItem.objects.filter(is_public_visible=True).exists()
+        assert not ItemHistory.objects.filter(event_type="LOCATION_CORRECTION").exists()
+
+    def test_invalid_requests_return_400(self):
+        item_id = self.items[0].id
+        assert self._patch({"changes": {"status": "IN_TRANSIT"}}).status_code == 400
+        assert self._patch({"ids": [item_id], "changes": {}}).status_code == 400
+        assert self._patch({"ids": [item_id], "changes": {"status": "LOST"}}).status_code == 400
+        assert self._patch({"filter": {"title": "x"}, "changes": {"status": "IN_TRANSIT"}}).status_code == 400
+        assert self._patch({"filter": {"box": "abc"}, "changes": {"status": "IN_TRANSIT"}}).status_code == 400
+        mismatched = {"box": self.storage_box.id, "current_location": self.floor_location.id}
+        assert self._patch({"ids": [item_id], "changes": mismatched}).status_code == 400
+        assert CollectionItem.objects.get(id=item_id).status == "AVAILABLE"
+
+
+@pytest.mark.django_db
+def test_item_lookup_resolves_codes_and_ids_in_one_query(test_data, volunteer_user, django_assert_num_queries):
+    """Batch lookup returns found items in request order plus the missing keys."""
+    client = test_data["client"]
+    token = get_volunteer_token(client)
+    snes, ps2, hidden = test_data["public_item_snes"], test_data["public_item_ps2"], test_data["hidden_item"]
+    body = {"item_codes": [ps2.item_code, "NOPE", snes.item_code, ps2.item_code], "ids": [hidden.id, snes.id, 999999]}
+
+    # Two user lookups for authentication, then a single item query.
+    with django_assert_num_queries(3):
+        response = client.post(
+            "/api/inventory/items/lookup/",
+            data=json.dumps(body),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = json.loads(response.content)
+    assert [item["item_code"] for item in data["results"]] == [ps2.item_code, snes.item_code, hidden.item_code]
+    assert data["results"][0]["current_location"]["name"] == ps2.current_location.name
+    assert data["missing"] == {"item_codes": ["NOPE"], "ids": [999999]}
+
+
+@pytest.mark.django_db
+def test_item_lookup_validates_request(client, volunteer_user):
+    token = get_volunteer_token(client)
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+    empty = client.post("/api/inventory/items/lookup/", data="{}", content_type="application/json", **auth)
+    assert empty.status_code == status.HTTP_400_BAD_REQUEST
+    too_many = json.dumps({"ids": list(range(5001))})
+    response = client.post("/api/inventory/items/lookup/", data=too_many, content_type="application/json", **auth)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestScanCache:
+    """Tests for the scan code resolution cache."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, floor_location, storage_location):
+        from inventory import scan
+
+        self.scan = scan
+        self.floor_location = floor_location
+        self.storage_location = storage_location
+        self.box = Box.objects.create(box_code="SCANBOX", label="Scan Box", location=storage_location)
+        self.item = CollectionItem.objects.create(
+            item_code="SCAN001", title="Scanned", current_location=storage_location, box=self.box
+        )
+
+    def test_repeat_scans_skip_the_database(self, django_assert_num_queries):
+        expected = {
+            "type": "item",
+            "id": self.item.id,
+            "current_location_id": self.storage_location.id,
+            "box_id": self.box.id,
+            "status": "AVAILABLE",
+        }
+        assert self.scan.resolve_code("SCAN001") == expected
+        # Served from the shared per-code cache entry.
+        with django_assert_num_queries(0):
+            assert self.scan.resolve_code("SCAN001") == expected
+
+        assert self.scan.resolve_code("SCANBOX") == {"type": "box", "id": self.box.id, "location_id": self.storage_location.id}
+        assert self.scan.resolve_code("UNKNOWN") is None
+
+    def test_item_save_invalidates(self):
+        self.scan.resolve_code("SCAN001")
+        self.item.current_location = self.floor_location
+        self.item.save()
+        assert self.scan.resolve_code("SCAN001")["current_location_id"] == self.floor_location.id
+
+        self.item.item_code = "SCAN002"
+        self.item.save()
+        assert self.scan.resolve_code("SCAN001") is None
+        assert self.scan.resolve_code("SCAN002")["id"] == self.item.id
+
+    def test_bulk_paths_invalidate(self, admin_user):
+        from inventory.bulk import bulk_update_items
+
+        self.scan.resolve_code("SCAN001")
+        self.box.mark_as_arrived(self.floor_location, user=admin_user)
+        assert self.scan.resolve_code("SCAN001")["current_location_id"] == self.floor_location.id
+
+        bulk_update_items(CollectionItem.objects.filter(id=self.item.id), {"status": "MAINTENANCE"})
+        assert self.scan.resolve_code("SCAN001")["status"] == "MAINTENANCE"
+
+        self.box.delete()
+        assert self.scan.resolve_code("SCAN001")["box_id"] is None
+
+    def test_scan_endpoint(self, client, volunteer_user):
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(client)}"}
+        response = client.get("/api/inventory/scan/SCANBOX/", **auth)
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content)["type"] == "box"
+        assert client.get("/api/inventory/scan/NOPE/", **auth).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_writes_only_drop_their_own_codes(self, django_assert_num_queries):
+        other = CollectionItem.objects.create(item_code="SCAN003", title="Other", current_location=self.floor_location)
+        self.scan.resolve_code("SCAN001")
+        self.scan.resolve_code("SCAN003")
+
+        other.title = "Renamed"
+        other.save()
+        with django_assert_num_queries(0):
+            assert self.scan.resolve_code("SCAN001")["id"] == self.item.id
+        with django_assert_num_queries(1):
+            assert self.scan.resolve_code("SCAN003")["id"] == other.id
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_tolerates_typos(client, floor_location):
+    """?fuzzy=true finds titles despite typos and ranks the closest match first."""
+    zelda = CollectionItem.objects.create(
+        item_code="FZ001", title="The Legend of Zelda: Ocarina of Time", platform="N64", current_location=floor_location
+    )
+    CollectionItem.objects.create(
+        item_code="FZ002", title="Zelda II: The Adventure of Link", platform="NES", current_location=floor_location
+    )
+    CollectionItem.objects.create(item_code="FZ003", title="Super Mario 64", platform="N64", current_location=floor_location)
+
+    exact = client.get("/api/inventory/public/items/?search=zelda ocarnia")
+    assert get_items_from_response(exact) == []
+
+    fuzzy = client.get("/api/inventory/public/items/?search=zelda ocarnia&fuzzy=true")
+    codes = [item["item_code"] for item in get_items_from_response(fuzzy)]
+    assert codes[0] == zelda.item_code
+    assert "FZ003" not in codes
+
+
+@pytest.mark.django_db
+def test_trigram_index_follows_renames_and_rebuild(client, floor_location):
+    from inventory import search
+    from inventory.models import ItemTrigram
+
+    item = CollectionItem.objects.create(
+        item_code="FZ010", title="Chrono Trigger", platform="SNES", current_location=floor_location
+    )
+    assert set(ItemTrigram.objects.filter(item=item).values_list("gram", flat=True)) == search.trigrams("Chrono Trigger SNES")
+
+    # Renames are re-indexed; unrelated saves are not.
+    item.title = "Chrono Cross"
+    item.save()
+    assert search.fuzzy_search_queryset(CollectionItem.objects.all(), "chrono cros").get() == item
+    assert not search.fuzzy_search_queryset(CollectionItem.objects.all(), "trigger").exists()
+
+    ItemTrigram.objects.all().delete()
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert search.fuzzy_search_queryset(CollectionItem.objects.all(), "crono cross").get() == item
+
+
+@pytest.mark.django_db
+def test_autocomplete_suggests_by_prefix(client, floor_location):
+    """Autocomplete matches title word starts, platforms and codes of public items, case-insensitively."""
+    CollectionItem.objects.create(
+        item_code="AC-001", title="The Legend of Zelda: Ocarina of Time", platform="N64", current_location=floor_location
+    )
+    CollectionItem.objects.create(item_code="AC-002", title="Super Mario 64", platform="N64", current_location=floor_location)
+    CollectionItem.objects.create(
+        item_code="AC-003", title="Zelda Secret", platform="N64", current_location=floor_location, is_public_visible=False
+    )
+    url = "/api/inventory/public/autocomplete/"
+
+    results = json.loads(client.get(f"{url}?q=OCAR").content)["results"]
+    assert results == [{"kind": "title", "label": "The Legend of Zelda: Ocarina of Time", "count": 1}]
+
+    results = json.loads(client.get(f"{url}?q=n6").content)["results"]
+    assert results == [{"kind": "platform", "label": "N64", "count": 2}]
+
+    results = json.loads(client.get(f"{url}?q=zel").content)["results"]
+    assert [result["label"] for result in results] == ["The Legend of Zelda: Ocarina of Time"]
+
+    assert json.loads(client.get(f"{url}?q=ac-00&limit=1").content)["results"] == [
+        {"kind": "code", "label": "AC-001", "count": 1}
+    ]
+    assert json.loads(client.get(f"{url}?q=").content)["results"] == []
+
+
+@pytest.mark.django_db
+def test_autocomplete_index_stays_in_sync(client, floor_location):
+    from inventory.models import AutocompleteEntry
+
+    item = CollectionItem.objects.create(item_code="AC-010", title="Chrono Trigger", current_location=floor_location)
+    url = "/api/inventory/public/autocomplete/?q=chrono"
+    assert [r["label"] for r in json.loads(client.get(url).content)["results"]] == ["Chrono Trigger"]
+
+    item.title = "Chrono Cross"
+    item.save()
+    assert [r["label"] for r in json.loads(client.get(url).content)["results"]] == ["Chrono Cross"]
+
+    # Saves that don't touch indexed fields leave the entries alone.
+    entry_ids = set(AutocompleteEntry.objects.values_list("id", flat=True))
+    item.status = "MAINTENANCE"
+    item.save(update_fields=["status", "updated_at"])
+    assert set(AutocompleteEntry.objects.values_list("id", flat=True)) == entry_ids
+
+    item.delete()
+    assert json.loads(client.get(url).content)["results"] == []
+
+
+@pytest.mark.django_db
+class TestDashboardStats:
+    """Tests for the cached dashboard statistics."""
+
+    STATS_URL = "/api/inventory/stats/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_data, volunteer_user):
+        from inventory import stats
+
+        self.stats = stats
+        self.client = test_data["client"]
+        self.floor_location = test_data["floor_location"]
+        Box.objects.create(box_code="STATBOX", label="Stats Box", location=self.floor_location)
+
+    def test_endpoint_returns_breakdown(self):
+        token = get_volunteer_token(self.client)
+        response = self.client.get(self.STATS_URL, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = json.loads(response.content)
+        assert (data["total_items"], data["total_boxes"], data["total_locations"]) == (3, 1, 2)
+        assert data["items_on_floor"] == 2
+        assert data["public_items"] == 2
+        assert data["items_by_type"] == {"SOFTWARE": 3, "HARDWARE": 0, "NON_ELECTRONIC": 0}
+        assert data["items_by_status"]["AVAILABLE"] == 3
+        floor = next(location for location in data["locations"] if location["id"] == self.floor_location.id)
+        assert (floor["box_count"], floor["item_count"]) == (1, 2)
+
+    def test_computed_in_two_queries_then_cached(self, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            first = self.stats.get_dashboard_stats()
+        with django_assert_num_queries(0):
+            assert self.stats.get_dashboard_stats() == first
+
+    def test_changes_trigger_single_recompute(self, django_assert_num_queries):
+        self.stats.get_dashboard_stats()
+        CollectionItem.objects.create(item_code="STAT001", title="New", current_location=self.floor_location)
+
+        # While another request holds the recompute lock, stale figures are served without queries.
+        cache.add(self.stats.DASHBOARD_STATS_LOCK_KEY, 1)
+        with django_assert_num_queries(0):
+            assert self.stats.get_dashboard_stats()["total_items"] == 3
+        cache.delete(self.stats.DASHBOARD_STATS_LOCK_KEY)
+
+        assert self.stats.get_dashboard_stats()["total_items"] == 4
+        assert not cache.get(self.stats.DASHBOARD_STATS_LOCK_KEY)
+
+    def test_expired_figures_are_recomputed(self, settings):
+        settings.DASHBOARD_STATS_FRESH_SECONDS = 0
+        first = self.stats.get_dashboard_stats()
+        assert self.stats.get_dashboard_stats()["generated_at"] != first["generated_at"]
+
+
+@pytest.mark.django_db
+class TestDailyRollups:
+    """Tests for the daily rollup table and time-series endpoint."""
+
+    URL = "/api/inventory/stats/timeseries/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, admin_user, floor_location, storage_location):
+        from inventory.models import DailyRollup
+
+        self.DailyRollup = DailyRollup
+        self.client = client
+        self.floor_location = floor_location
+        self.storage_location = storage_location
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {get_admin_token(client)}"}
+
+    def _rollups(self):
+        return set(self.DailyRollup.objects.values_list("metric", "dimension", "count"))
+
+    def test_hooks_and_bulk_paths_increment_rollups(self, admin_user):
+        item = CollectionItem.objects.create(item_code="RU001", title="Rolled", current_location=self.floor_location)
+        CollectionItem.objects.create(
+            item_code="RU002", title="Console", item_type="HARDWARE", current_location=self.floor_location
+        )
+        ItemHistory.objects.create(item=item, event_type="INITIAL", to_location=self.floor_location)
+        box = Box.objects.create(box_code="RUBOX", location=self.floor_location)
+        item.box = box
+        item.save()
+        box.mark_as_arrived(self.storage_location, user=admin_user)
+
+        assert self._rollups() == {
+            ("items_added", "SOFTWARE", 1),
+            ("items_added", "HARDWARE", 1),
+            ("history_events", "INITIAL", 1),
+            ("history_events", "ARRIVED", 1),
+        }
+
+        # A rebuild from the source tables agrees with the incremental counts.
+        before = self._rollups()
+        self.DailyRollup.objects.update(count=0)
+        call_command("rebuild_daily_rollups", "--full", stdout=StringIO())
+        assert self._rollups() == before
+
+    def test_timeseries_reads_rollups(self, django_assert_num_queries):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        self.DailyRollup.objects.create(metric="items_added", day=yesterday, dimension="SOFTWARE", count=4)
+        self.DailyRollup.objects.create(metric="items_added", day=yesterday, dimension="HARDWARE", count=1)
+        self.DailyRollup.objects.create(metric="history_events", day=yesterday, dimension="ARRIVED", count=9)
+
+        # Two user lookups for authentication, then one rollup query.
+        with django_assert_num_queries(3):
+            response = self.client.get(f"{self.URL}?start={yesterday}&end={today}", **self.auth)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content)["series"] == [
+            {"day": str(yesterday), "total": 5, "by_dimension": {"SOFTWARE": 4, "HARDWARE": 1}},
+            {"day": str(today), "total": 0, "by_dimension": {}},
+        ]
+        assert len(json.loads(self.client.get(self.URL, **self.auth).content)["series"]) == 30
+
+    def test_timeseries_validates_params(self, volunteer_user):
+        assert self.client.get(f"{self.URL}?metric=nope", **self.auth).status_code == 400
+        assert self.client.get(f"{self.URL}?start=2026-02-01&end=2026-01-01", **self.auth).status_code == 400
+        volunteer_auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(self.client)}"}
+        assert self.client.get(self.URL, **volunteer_auth).status_code == 403
+
+
+@pytest.mark.django_db
+class TestItemsAsOf:
+    """Tests for point-in-time item location queries."""
+
+    URL = "/api/inventory/as-of/"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, admin_user, floor_location, storage_location):
+        self.client = client
+        self.floor = floor_location
+        self.storage = storage_location
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {get_admin_token(client)}"}
+        self.t0 = timezone.now() - timedelta(days=10)
+
+        def event(item, event_type, location, days):
+            history = ItemHistory.objects.create(item=item, event_type=event_type, to_location=location)
+            ItemHistory.objects.filter(pk=history.pk).update(created_at=self.t0 + timedelta(days=days))
+
+        self.moved = CollectionItem.objects.create(item_code="ASOF1", title="Moved Up", current_location=floor_location)
+        event(self.moved, "INITIAL", storage_location, 0)
+        event(self.moved, "MOVE_REQUESTED", floor_location, 1)
+        event(self.moved, "ARRIVED", floor_location, 2)
+        self.pulled = CollectionItem.objects.create(item_code="ASOF2", title="Pulled", current_location=storage_location)
+        event(self.pulled, "INITIAL", floor_location, 0)
+        event(self.pulled, "LOCATION_CORRECTION", storage_location, 2)
+        self.later = CollectionItem.objects.create(item_code="ASOF3", title="Later", current_location=floor_location)
+        event(self.later, "INITIAL", floor_location, 3)
+
+    def test_iter_locations_as_of_replays_history(self):
+        from inventory.locations import iter_locations_as_of
+
+        def as_of(days, **kwargs):
+            rows = iter_locations_as_of(self.t0 + timedelta(days=days), chunk_size=2, **kwargs)
+            return {(row["item_code"], row["location_id"]) for row in rows}
+
+        assert as_of(1) == {("ASOF1", self.storage.id), ("ASOF2", self.floor.id)}
+        assert as_of(1, floor_only=True) == {("ASOF2", self.floor.id)}
+        assert as_of(5) == {("ASOF1", self.floor.id), ("ASOF2", self.storage.id), ("ASOF3", self.floor.id)}
+        assert as_of(5, location_ids=[self.storage.id]) == {("ASOF2", self.storage.id)}
+        assert as_of(-1) == set()
+
+    def test_endpoint_streams_ndjson(self):
+        at = (self.t0 + timedelta(days=1)).isoformat()
+        response = self.client.get(self.URL, {"at": at, "floor": "true"}, **self.auth)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        assert [(row["item_code"], row["location_name"], row["location_type"]) for row in rows] == [
+            ("ASOF2", self.floor.name, "FLOOR")
+        ]
+
+    def test_endpoint_validates_params(self, volunteer_user):
+        assert self.client.get(self.URL, {"at": "yesterday"}, **self.auth).status_code == 400
+        assert self.client.get(self.URL, {"at": "2026-01-01", "location": "x"}, **self.auth).status_code == 400
+        volunteer_auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(self.client)}"}
+        assert self.client.get(self.URL, {"at": "2026-01-01"}, **volunteer_auth).status_code == 403
+
+    def test_command_writes_csv(self):
+        out = StringIO()
+        call_command("items_as_of", (self.t0 + timedelta(days=5)).date().isoformat(), "--floor", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "id,item_code,title,location_id,location_name,location_type,event_at"
+        assert sorted(line.split(",")[1] for line in lines[1:]) == ["ASOF1", "ASOF3"]
+
+
+@pytest.mark.django_db
+class TestItemHistoryEndpoints:
+    """Tests for the keyset-paginated item and box history endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, volunteer_user, floor_location, storage_location):
+        self.client = client
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(client)}"}
+        self.box = Box.objects.create(box_code="HIST-BOX", label="History box", location=storage_location)
+        self.items = []
+        for n in range(3):
+            item = CollectionItem.objects.create(
+                item_code=f"HIST{n}", title=f"History {n}", current_location=storage_location, box=self.box
+            )
+            ItemHistory.objects.create(item=item, event_type="INITIAL", to_location=storage_location)
+            ItemHistory.objects.create(
+                item=item,
+                event_type="LOCATION_CORRECTION",
+                from_location=storage_location,
+                to_location=floor_location,
+                acted_by=volunteer_user,
+            )
+            self.items.append(item)
+
+    def test_item_history_walks_pages_newest_first(self):
+        item = self.items[0]
+        url = f"/api/inventory/items/{item.id}/history/?page_size=1"
+
+        first = self.client.get(url, **self.auth).json()
+        assert [event["event_type"] for event in first["results"]] == ["LOCATION_CORRECTION"]
+        event = first["results"][0]
+        assert event["item_code"] == item.item_code
+        assert event["to_location"]["name"] == "Main Floor"
+        assert event["acted_by_name"] == "Volunteer User"
+        assert first["previous"] is None
+
+        second = self.client.get(first["next"], **self.auth).json()
+        assert [event["event_type"] for event in second["results"]] == ["INITIAL"]
+        assert second["results"][0]["acted_by_name"] is None
+        assert second["next"] is None
+        assert self.client.get("/api/inventory/items/999999/history/", **self.auth).status_code == 404
+
+    def test_many_items_history_is_one_query_per_table(self, django_assert_num_queries):
+        ids = ",".join(str(item.id) for item in self.items[:2])
+        # Two user lookups for authentication, then one query each on item_history and its archive.
+        with django_assert_num_queries(4):
+            response = self.client.get(f"/api/inventory/items/history/?ids={ids}&page_size=10", **self.auth)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert len(results) == 4
+        assert {event["item"] for event in results} == {self.items[0].id, self.items[1].id}
+
+    def test_many_items_history_validates_ids(self):
+        url = "/api/inventory/items/history/"
+        assert self.client.get(url, **self.auth).status_code == 400
+        assert self.client.get(url, {"ids": "1,x"}, **self.auth).status_code == 400
+        assert self.client.get(url, {"ids": ",".join(map(str, range(1, 502)))}, **self.auth).status_code == 400
+
+    def test_box_history_covers_its_items(self, django_assert_num_queries):
+        # Authentication, the box, then the history page from item_history and its archive.
+        with django_assert_num_queries(5):
+            response = self.client.get(f"/api/boxes/{self.box.id}/history/?page_size=100", **self.auth)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["results"]) == 6
+
+
+@pytest.mark.django_db
+class TestArchiveItemHistory:
+    """Tests for archiving old history events and reading them back."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, volunteer_user, floor_location, storage_location):
+        self.client = client
+        self.floor = floor_location
+        self.storage = storage_location
+        self.now = timezone.now()
+
+        def event(item, event_type, location, days_ago):
+            history = ItemHistory.objects.create(item=item, event_type=event_type, to_location=location)
+            ItemHistory.objects.filter(pk=history.pk).update(created_at=self.now - timedelta(days=days_ago))
+            return history.pk
+
+        self.item = CollectionItem.objects.create(item_code="ARCH1", title="Archived", current_location=storage_location)
+        self.events = [
+            event(self.item, "INITIAL", storage_location, 400),
+            event(self.item, "MOVE_REQUESTED", floor_location, 395),
+            event(self.item, "ARRIVED", floor_location, 390),
+            event(self.item, "MOVE_REJECTED", None, 385),
+            event(self.item, "MOVE_REQUESTED", storage_location, 1),
+        ]
+        self.old_item = CollectionItem.objects.create(item_code="ARCH2", title="Old", current_location=storage_location)
+        self.old_initial = event(self.old_item, "INITIAL", storage_location, 400)
+
+    def test_command_keeps_latest_events(self):
+        out = StringIO()
+        call_command("archive_item_history", "--dry-run", stdout=out)
+        assert out.getvalue().startswith("3 history events")
+        assert not ArchivedItemHistory.objects.exists()
+
+        call_command("archive_item_history", "--batch-size", "2", stdout=StringIO())
+
+        e1, e2, e3, e4, e5 = self.events
+        assert set(ArchivedItemHistory.objects.values_list("id", flat=True)) == {e1, e2, e4}
+        assert set(ItemHistory.objects.values_list("id", flat=True)) == {e3, e5, self.old_initial}
+        archived = ArchivedItemHistory.objects.get(id=e1)
+        assert (archived.seq, archived.event_type, archived.to_location_id) == (1, "INITIAL", self.storage.id)
+        assert get_current_location(self.item.id) == self.floor
+        assert ItemHistory.objects.create(item=self.item, event_type="VERIFIED", to_location=self.floor).seq == 6
+
+    def test_deleting_a_kept_event_restores_the_next_one(self):
+        call_command("archive_item_history", stdout=StringIO())
+        e1, e2, e3, e4, e5 = self.events
+
+        ItemHistory.objects.filter(pk=e3).delete()
+        assert get_current_location(self.item.id) == self.storage
+        assert ItemHistory.objects.get(pk=e1).seq == 1
+        assert not ArchivedItemHistory.objects.filter(pk=e1).exists()
+
+        self.item.delete()
+        assert not ArchivedItemHistory.objects.filter(item_id=self.item.id).exists()
+
+    def test_history_endpoint_pages_through_archive(self):
+        call_command("archive_item_history", stdout=StringIO())
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {get_volunteer_token(self.client)}"}
+
+        seen = []
+        url = f"/api/inventory/items/{self.item.id}/history/?page_size=2"
+        while url:
+            page = self.client.get(url, **auth).json()
+            seen += [event["id"] for event in page["results"]]
+            url = page["next"]
+        assert seen == self.events[::-1]
+
+    def test_as_of_reads_archived_events(self):
+        from inventory.locations import iter_locations_as_of
+
+        call_command("archive_item_history", stdout=StringIO())
+
+        def as_of(days_ago):
+            return {row["item_code"]: row["location_id"] for row in iter_locations_as_of(self.now - timedelta(days=days_ago))}
+
+        assert as_of(397) == {"ARCH1": self.storage.id, "ARCH2": self.storage.id}
+        assert as_of(388) == {"ARCH1": self.floor.id, "ARCH2": self.storage.id}
+
+    def test_rollup_rebuild_counts_archived_events(self):
+        from inventory.models import DailyRollup
+
+        call_command("archive_item_history", stdout=StringIO())
+        DailyRollup.rebuild()
+
+        history_rollups = DailyRollup.objects.filter(metric=DailyRollup.HISTORY_EVENTS)
+        assert sum(history_rollups.values_list("count", flat=True)) == 6
@@ -4,8 +4,13 @@ from .views import (
     CollectionItemViewSet,
     PublicCollectionItemViewSet,
     AdminCollectionItemViewSet,
+    ExportJobViewSet,
     dashboard_stats,
+    stats_timeseries,
+    items_as_of,
     export_items,
+    public_autocomplete,
+    scan_code,
 )
 
 # from .views import InventoryItemViewSet
@@ -25,6 +30,7 @@ from .views import (
 # Public catalogue (read-only, no auth):
 # GET    /api/inventory/public/items/       - List public items (filter/search)
 # GET    /api/inventory/public/items/{id}/ - Retrieve public item detail
+# GET    /api/inventory/public/autocomplete/?q= - Prefix suggestions for the search box
 #
 # Admin/volunteer CRUD (auth required):
 # GET    /api/inventory/items/           - List all items
@@ -33,17 +39,34 @@ from .views import (
 # PUT    /api/inventory/items/{id}/      - Full update
 # PATCH  /api/inventory/items/{id}/     - Partial update
 # DELETE /api/inventory/items/{id}/     - Soft delete (admin only)
+# POST   /api/inventory/items/import/    - Bulk import items from CSV/JSON (admin only)
+# PATCH  /api/inventory/items/bulk/      - Bulk update box/location/visibility/status
+# POST   /api/inventory/items/lookup/    - Resolve many item codes/ids in one request
+# GET    /api/inventory/items/{id}/history/ - Item history events, keyset paginated
+# GET    /api/inventory/items/history/?ids= - History events of many items, keyset paginated
+# GET    /api/inventory/stats/           - Dashboard statistics
+# GET    /api/inventory/stats/timeseries/ - Daily items added / history events (admin only)
+# GET    /api/inventory/as-of/?at=       - Item locations at a point in time, as NDJSON (admin only)
+# GET    /api/inventory/scan/{code}/     - Resolve a scanned item/box code (cached)
 # GET    /api/inventory/export/          - Export items as CSV
+# POST   /api/inventory/export-jobs/     - Queue a background CSV export
+# GET    /api/inventory/export-jobs/{id}/          - Poll export job status
+# GET    /api/inventory/export-jobs/{id}/download/ - Download finished export
 
 router = DefaultRouter()
 router.register(r"items", CollectionItemViewSet, basename="item")
+router.register(r"export-jobs", ExportJobViewSet, basename="export-job")
 
 public_router = DefaultRouter()
 public_router.register(r"items", PublicCollectionItemViewSet, basename="public-item")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("public/autocomplete/", public_autocomplete, name="public-autocomplete"),
     path("public/", include(public_router.urls)),
     path("stats/", dashboard_stats, name="dashboard-stats"),
+    path("stats/timeseries/", stats_timeseries, name="stats-timeseries"),
+    path("as-of/", items_as_of, name="items-as-of"),
+    path("scan/<str:code>/", scan_code, name="scan-code"),
     path("export/", export_items, name="export-items"),
 ]
@@ -2,8 +2,9 @@
 Utility functions for inventory management.
 """
 
-from .models import ItemHistory
-from .constants import LOCATION_CHANGING_EVENTS
+from django.db.models import Count, Max, Min
+
+from .models import ArchivedItemHistory, CollectionItem, ItemHistory, ItemLatestEvent
 
 
 def get_current_location(item_id):
@@ -17,8 +18,8 @@ def get_current_location(item_id):
     - LOCATION_CORRECTION
 
     Algorithm:
-        Finds the most recent location-changing event (ordered by created_at descending)
-        and returns its to_location field. If no location-changing events exist, returns None.
+        Finds the most recent location-changing event (highest per-item seq, read from
+        the ItemLatestEvent snapshot) and returns its to_location field. If no location-changing events exist, returns None.
 
     Args:
         item_id: The ID of the CollectionItem
@@ -29,7 +30,7 @@ def get_current_location(item_id):
 
     Edge Cases and Behavior:
         - Multiple location-changing events: The function correctly handles multiple events
-          by selecting the most recent one (ordered by created_at descending). This is the
+          by selecting the most recent one (highest seq). This is the
           expected behavior as later events supersede earlier ones.
 
         - INITIAL event with to_location=None: If the INITIAL event has a null to_location,
@@ -49,10 +50,7 @@ def get_current_location(item_id):
         - Invalid item_id: If the item_id doesn't exist, the query will return no results
           and the function will return None. No exception is raised.
     """
-    # Get the most recent location-changing event
-    last_event = (
-        ItemHistory.objects.filter(item_id=item_id, event_type__in=LOCATION_CHANGING_EVENTS).order_by("-created_at").first()
-    )
+    last_event = get_latest_location_event(item_id)
 
     if last_event:
         return last_event.to_location
@@ -60,21 +58,54 @@ def get_current_location(item_id):
     return None
 
 
+def get_latest_location_event(item_id):
+    """
+    Get the most recent location-changing event for an item, or None.
+
+    Read from the item's ItemLatestEvent snapshot: one primary-key probe, and
+    "most recent" means highest seq, so events sharing a timestamp are ordered
+    the way they were written.
+    """
+    snapshot = (
+        ItemLatestEvent.objects.filter(item_id=item_id)
+        .select_related("latest_location_event__to_location")
+        .only("item_id", "latest_location_event")
+        .first()
+    )
+    return snapshot.latest_location_event if snapshot else None
+
+
+# Relations rendered by ItemHistorySerializer, joined so a page of events is one query.
+ITEM_HISTORY_RELATED_FIELDS = ["item", "from_location", "to_location", "acted_by", "movement_request"]
+
+
 def get_item_location_history(item_id):
     """
-    Get the complete movement history for an item.
+    Get the movement history for an item that is still in item_history.
+    Events archived by archive_item_history are in ArchivedItemHistory.
 
     Args:
         item_id: The ID of the CollectionItem
 
     Returns:
-        QuerySet of ItemHistory ordered by created_at
+        QuerySet of ItemHistory in the order the events were written
     """
-    return (
-        ItemHistory.objects.filter(item_id=item_id)
-        .select_related("from_location", "to_location", "acted_by", "movement_request")
-        .order_by("created_at")
-    )
+    return get_items_history([item_id]).order_by("seq")
+
+
+def get_items_history(item_ids, archived=False):
+    """
+    Get the history of many items in one query, for timelines and list views.
+
+    Args:
+        item_ids: Iterable of CollectionItem IDs, or a values("id") QuerySet
+        archived: Read the ArchivedItemHistory table instead of item_history
+
+    Returns:
+        QuerySet of events with locations, user, movement request and item joined
+    """
+    model = ArchivedItemHistory if archived else ItemHistory
+    return model.objects.filter(item_id__in=item_ids).select_related(*ITEM_HISTORY_RELATED_FIELDS)
 
 
 def is_item_in_transit(item_id):
@@ -87,12 +118,10 @@ def is_item_in_transit(item_id):
     Returns:
         Boolean
     """
-    last_event = ItemHistory.objects.filter(item_id=item_id).order_by("-created_at").first()
-
-    if last_event:
-        return last_event.event_type == "IN_TRANSIT"
-
-    return False
+    last_event_type = (
+        ItemLatestEvent.objects.filter(item_id=item_id).values_list("latest_event__event_type", flat=True).first()
+    )
+    return last_event_type == "IN_TRANSIT"
 
 
 def get_pending_movements_for_item(item_id):
@@ -112,3 +141,59 @@ def get_pending_movements_for_item(item_id):
         .select_related("from_location", "to_location", "requested_by")
         .order_by("-created_at")
     )
+
+
+def get_catalogue_facets(queryset):
+    """
+    Count items per platform, item_type, status and is_on_floor value.
+
+    Args:
+        queryset: A filtered CollectionItem QuerySet
+
+    Returns:
+        dict: {"total": int, "<facet>": [{"value", "label", "count"}, ...]}, each
+        facet sorted by count descending. Computed with a single grouped query.
+    """
+    labels = {
+        "item_type": dict(CollectionItem.ITEM_TYPE_CHOICES),
+        "status": dict(CollectionItem.STATUS_CHOICES),
+    }
+    facet_fields = ["platform", "item_type", "status", "is_on_floor"]
+    counts = {field: {} for field in facet_fields}
+    total = 0
+
+    rows = queryset.order_by().values(*facet_fields).annotate(count=Count("id"))
+    for row in rows:
+        total += row["count"]
+        for field in facet_fields:
+            counts[field][row[field]] = counts[field].get(row[field], 0) + row["count"]
+
+    facets = {"total": total}
+    for field in facet_fields:
+        facets[field] = [
+            {"value": value, "label": labels.get(field, {}).get(value, value), "count": count}
+            for value, count in sorted(counts[field].items(), key=lambda pair: (-pair[1], str(pair[0])))
+        ]
+    return facets
+
+
+def split_id_range(queryset, parts):
+    """
+    Split a queryset's primary keys into contiguous id ranges for parallel work.
+
+    Args:
+        queryset: Any model QuerySet
+        parts: Maximum number of ranges to return
+
+    Returns:
+        list: Inclusive (low, high) id tuples in ascending order covering every
+        row, or an empty list when the queryset is empty.
+    """
+    bounds = queryset.order_by().aggregate(low=Min("id"), high=Max("id"))
+    low, high = bounds["low"], bounds["high"]
+    if low is None:
+        return []
+    span = high - low + 1
+    parts = max(1, min(parts, span))
+    size = -(-span // parts)
+    return [(start, min(start + size - 1, high)) for start in range(low, high + 1, size)]
@@ -1,41 +1,212 @@
-import csv
-from datetime import datetime
-
-from django.http import HttpResponse
-from rest_framework import viewsets, permissions, filters, status
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from core.pagination import KeysetPagination, OptInKeysetPaginationMixin
+from core.renderers import NDJSONRenderer, iter_ndjson
+from rest_framework import viewsets, mixins, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from users.permissions import IsAdmin, IsVolunteer
 
-from .models import Box, CollectionItem, Location
+from .autocomplete import AUTOCOMPLETE_DEFAULT_LIMIT, AUTOCOMPLETE_MAX_LIMIT, suggest
+from .bulk import bulk_update_items
+from .cache import (
+    FACET_IGNORED_PARAMS,
+    CatalogueResponseCacheMixin,
+    ConditionalListMixin,
+    make_cache_key,
+)
+from .exports import (
+    get_export_queryset,
+    iter_csv,
+    iter_export_rows,
+    parse_export_filters,
+    submit_export_job,
+)
+from .imports import import_items, read_csv_rows
+from .locations import iter_locations_as_of, parse_as_of
+from .models import Box, CollectionItem, DailyRollup, ExportJob, Location
+from .scan import resolve_code
+from .search import FullTextSearchFilter
+from .stats import get_dashboard_stats
+from .utils import get_catalogue_facets, get_items_history
 from .serializers import (
     BoxDetailSerializer,
     BoxSerializer,
     CollectionItemSerializer,
     PublicCollectionItemSerializer,
     AdminCollectionItemSerializer,
+    BulkItemUpdateSerializer,
+    ExportJobSerializer,
+    ItemHistorySerializer,
+    ItemLookupSerializer,
     LocationSerializer,
     LocationDetailSerializer,
 )
 
 
-class CollectionItemViewSet(viewsets.ModelViewSet):
+# Most items a single items/history/ request may ask for.
+HISTORY_MAX_ITEMS = 500
+
+
+def history_page(request, item_ids, view=None):
+    """
+    Return one keyset page of the items' history events, newest first on (created_at, id).
+    Pages merge item_history with its archive, so paging back reaches archived events.
+    Pages are served with ?cursor= and sized with ?page_size=, like ?pagination=cursor lists.
+    """
+    paginator = KeysetPagination()
+    page = paginator.paginate_querysets(
+        [get_items_history(item_ids), get_items_history(item_ids, archived=True)], request, view=view
+    )
+    return paginator.get_paginated_response(ItemHistorySerializer(page, many=True).data)
+
+
+class CollectionItemViewSet(OptInKeysetPaginationMixin, viewsets.ModelViewSet):
     """
     Internal ViewSet for collection items.
     Supports update of item box assignment via PATCH.
+    Pass ?pagination=cursor for keyset pagination on (created_at, id).
+    List with 'Accept: application/x-ndjson' (or ?format=ndjson) streams every
+    matching item as one JSON object per line, unpaginated.
+    POST items/import/ bulk-creates items from CSV or JSON (admin only).
+    PATCH items/bulk/ applies box/location/visibility/status changes to many items at once.
+    POST items/lookup/ resolves a batch of scanned item codes/ids in one query.
+    GET items/{id}/history/ and items/history/?ids= page through item history events.
     """
 
     queryset = CollectionItem.objects.all().select_related("box", "current_location")
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    ndjson_chunk_size = 2000
 
     def get_serializer_class(self):
         return AdminCollectionItemSerializer
 
     def get_permissions(self):
-        # Match the Admin view: only Admins should be able to trigger 'destroy'
-        if self.action == "destroy":
+        # Match the Admin view: only Admins should be able to trigger 'destroy' or bulk imports
+        if self.action in ["destroy", "bulk_import"]:
             return [IsAdmin()]
         return [IsVolunteer()]
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Bulk-create items from an uploaded CSV ('file') or a JSON list of item objects.
+        Rows use item field names plus 'location' (name or id) and optional 'box' (box code).
+        Invalid rows are reported per row; valid rows are still imported.
+        """
+        upload = request.FILES.get("file")
+        if upload is not None:
+            rows = read_csv_rows(upload.file)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {"detail": "Upload a CSV 'file' or send a JSON list of items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = import_items(rows, user=request.user)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        Apply the same changes to many items in one transaction.
+        Body: {"ids": [...]} or {"filter": {...}}, plus {"changes": {"box", "current_location",
+        "is_public_visible", "status"}} and optional "notes" for the history events.
+        """
+        serializer = BulkItemUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if "ids" in data:
+            queryset = CollectionItem.objects.filter(id__in=data["ids"])
+        else:
+            try:
+                queryset = CollectionItem.objects.filter(**data["filter"])
+            except (ValueError, TypeError, DjangoValidationError):
+                return Response({"detail": "Invalid filter value."}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = bulk_update_items(queryset, data["changes"], user=request.user, notes=data["notes"])
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def lookup(self, request):
+        """
+        Resolve many scanned item codes and/or ids in a single query.
+        Body: {"item_codes": [...], "ids": [...]}. Returns the found items in request
+        order (codes first) and the codes/ids that matched nothing.
+        """
+        serializer = ItemLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        item_codes = list(dict.fromkeys(serializer.validated_data.get("item_codes", [])))
+        ids = list(dict.fromkeys(serializer.validated_data.get("ids", [])))
+
+        items = self.get_queryset().filter(Q(item_code__in=item_codes) | Q(id__in=ids))
+        by_code = {}
+        by_id = {}
+        for item in items:
+            by_code[item.item_code] = item
+            by_id[item.id] = item
+
+        found = []
+        seen = set()
+        for item in [by_code.get(code) for code in item_codes] + [by_id.get(item_id) for item_id in ids]:
+            if item is not None and item.id not in seen:
+                seen.add(item.id)
+                found.append(item)
+
+        return Response(
+            {
+                "results": self.get_serializer(found, many=True).data,
+                "missing": {
+                    "item_codes": [code for code in item_codes if code not in by_code],
+                    "ids": [item_id for item_id in ids if item_id not in by_id],
+                },
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """Page through an item's history events, newest first."""
+        item = self.get_object()
+        return history_page(request, [item.id], view=self)
+
+    @action(detail=False, methods=["get"], url_path="history", url_name="history-many")
+    def history_many(self, request):
+        """
+        Page through the history events of many items in one request, newest first.
+        Query: ?ids=1,2,3 (at most HISTORY_MAX_ITEMS). Events carry 'item' for grouping.
+        """
+        try:
+            ids = list(dict.fromkeys(int(value) for value in request.query_params.get("ids", "").split(",") if value))
+        except ValueError:
+            return Response({"detail": "Invalid ids. Must be comma-separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids or len(ids) > HISTORY_MAX_ITEMS:
+            return Response(
+                {"detail": f"Provide between 1 and {HISTORY_MAX_ITEMS} item ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return history_page(request, ids, view=self)
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return self.stream_ndjson(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def stream_ndjson(self, queryset):
+        """Stream the whole queryset as NDJSON from a chunked iterator, with bounded memory."""
+        serializer = self.get_serializer()
+        rows = (serializer.to_representation(item) for item in queryset.iterator(chunk_size=self.ndjson_chunk_size))
+        return StreamingHttpResponse(iter_ndjson(rows), content_type=NDJSONRenderer.media_type)
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_public_visible = False
@@ -49,16 +220,29 @@ class BoxViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /api/boxes/ - List all boxes
     - GET /api/boxes/{id}/ - Retrieve box with items
     - POST /api/boxes/{id}/mark-arrived/ - Mark box as arrived at destination
+    - GET /api/boxes/{id}/history/ - Page through the history of the box's items
     """
 
     queryset = Box.objects.all().prefetch_related("items")
     permission_classes = [IsVolunteer]
 
+    def get_queryset(self):
+        if self.action == "history":
+            # The history page reads the items itself.
+            return Box.objects.all()
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.action in ["retrieve", "mark_arrived"]:
             return BoxDetailSerializer
         return BoxSerializer
 
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """Page through the history events of the items currently in the box, newest first."""
+        box = self.get_object()
+        return history_page(request, box.items.values("id"), view=self)
+
     @action(detail=True, methods=["post"], url_path="mark-arrived")
     def mark_arrived(self, request, pk=None):
         """Mark a box as arrived and sync all contained items to destination location."""
@@ -101,17 +285,24 @@ class BoxViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for locations.
-    - GET /api/locations/ - List all locations with box/item counts
+    - GET /api/locations/ - List all locations with box/item counts (supports ETag / If-None-Match)
     - GET /api/locations/{id}/ - Retrieve location with nested boxes
     - POST /api/locations/ - Create a new location
     - PUT/PATCH /api/locations/{id}/ - Update a location
     - DELETE /api/locations/{id}/ - Delete a location (admin only)
     """
 
-    queryset = Location.objects.all().prefetch_related("boxes", "current_items")
+    queryset = Location.objects.all()
+
+    def get_queryset(self):
+        # box_count/item_count are stored columns; only the detail view needs boxes.
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related("boxes")
+        return queryset
 
     def get_permissions(self):
         if self.action in ["destroy"]:
@@ -124,7 +315,12 @@ class LocationViewSet(viewsets.ModelViewSet):
         return LocationSerializer
 
 
-class PublicCollectionItemViewSet(viewsets.ReadOnlyModelViewSet):
+class PublicCollectionItemViewSet(
+    ConditionalListMixin,
+    CatalogueResponseCacheMixin,
+    OptInKeysetPaginationMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     Public-facing ViewSet for collection items.
     Provides read-only access to public catalogue with filtering and search.
@@ -132,12 +328,17 @@ class PublicCollectionItemViewSet(viewsets.ReadOnlyModelViewSet):
     Endpoints:
     - GET /api/public/items/ - List all public items (with filtering/search)
     - GET /api/public/items/{id}/ - Retrieve single public item
+    - GET /api/public/items/facets/ - Counts per platform/item_type/status/is_on_floor
+
+    List supports ?pagination=cursor for keyset pagination without a COUNT query.
+    List and retrieve responses are cached until catalogue data changes, and
+    list responses carry ETag/Last-Modified validators for conditional GETs.
     """
 
-    queryset = CollectionItem.objects.filter(is_public_visible=True).select_related("current_location")
+    queryset = CollectionItem.objects.filter(is_public_visible=True).select_related("box", "current_location")
     serializer_class = PublicCollectionItemSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ["title", "description", "item_code"]
     ordering_fields = ["title", "platform", "created_at"]
 
@@ -167,6 +368,16 @@ class PublicCollectionItemViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """Return facet counts for the current search/platform/is_on_floor filters."""
+        cache_key = make_cache_key("facets", request.query_params, exclude=FACET_IGNORED_PARAMS)
+        data = cache.get(cache_key)
+        if data is None:
+            data = get_catalogue_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(cache_key, data, settings.CATALOGUE_FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
 
 class AdminCollectionItemViewSet(viewsets.ModelViewSet):
     """
@@ -199,104 +410,189 @@ class AdminCollectionItemViewSet(viewsets.ModelViewSet):
 def dashboard_stats(request):
     """
     Returns dashboard statistics.
-    - GET /api/inventory/stats/ - Get total items, boxes, and locations count
+    - GET /api/inventory/stats/ - Get total items, boxes, and locations count, plus items
+      on the floor, public items, items per type and status, and per-location box/item counts
+
+    Served from a stale-while-revalidate cache (see inventory/stats.py).
+    """
+    return Response(get_dashboard_stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def stats_timeseries(request):
+    """
+    Daily time series for admin charts, read only from the daily rollup table.
+    - GET /api/inventory/stats/timeseries/?metric=items_added|history_events&start=YYYY-MM-DD&end=YYYY-MM-DD
+    Defaults to items_added over the last 30 days. Every day in the range is
+    returned, with its total and a breakdown by item_type or event_type.
     """
+    metric = request.query_params.get("metric", DailyRollup.ITEMS_ADDED)
+    if metric not in dict(DailyRollup.METRIC_CHOICES):
+        return Response(
+            {"detail": f"Invalid metric. Use one of: {', '.join(dict(DailyRollup.METRIC_CHOICES))}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        end = request.query_params.get("end")
+        end = datetime.strptime(end, "%Y-%m-%d").date() if end else timezone.localdate()
+        start = request.query_params.get("start")
+        start = datetime.strptime(start, "%Y-%m-%d").date() if start else end - timedelta(days=29)
+    except ValueError:
+        return Response({"detail": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end or (end - start).days > 730:
+        return Response(
+            {"detail": "start must not be after end, and the range may span at most 731 days."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    days = {start + timedelta(days=offset): {} for offset in range((end - start).days + 1)}
+    rollups = DailyRollup.objects.filter(metric=metric, day__range=(start, end)).values_list("day", "dimension", "count")
+    for day, dimension, count in rollups:
+        days[day][dimension] = count
+
     return Response(
         {
-            "total_items": CollectionItem.objects.count(),
-            "total_boxes": Box.objects.count(),
-            "total_locations": Location.objects.count(),
+            "metric": metric,
+            "start": start,
+            "end": end,
+            "series": [
+                {"day": day, "total": sum(by_dimension.values()), "by_dimension": by_dimension}
+                for day, by_dimension in days.items()
+            ],
         }
     )
 
 
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def items_as_of(request):
+    """
+    Where every item was at a point in time, reconstructed from item history.
+    - GET /api/inventory/as-of/?at=YYYY-MM-DD|<ISO datetime>&location=<id>&floor=true
+    A date means the end of that day. Streams one NDJSON line per item:
+    {"id", "item_code", "title", "location_id", "location_name", "location_type", "event_at"}.
+    """
+    try:
+        at = parse_as_of(request.query_params.get("at"))
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    location_ids = None
+    if request.query_params.get("location"):
+        try:
+            location_ids = [int(request.query_params["location"])]
+        except ValueError:
+            return Response({"detail": "Invalid location. Must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    floor_only = request.query_params.get("floor", "").lower() in ("1", "true")
+
+    rows = iter_locations_as_of(at, location_ids=location_ids, floor_only=floor_only)
+    return StreamingHttpResponse(iter_ndjson(rows), content_type=NDJSONRenderer.media_type)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def public_autocomplete(request):
+    """
+    Suggest titles, platforms and item codes of public items for a typed prefix.
+    Accepts ?q= (the prefix) and optional ?limit= (default 10, max 50).
+    Returns {"results": [{"kind", "label", "count"}]}, most common first.
+    """
+    try:
+        limit = int(request.query_params.get("limit", AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        limit = AUTOCOMPLETE_DEFAULT_LIMIT
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+    cache_key = make_cache_key("autocomplete", request.query_params, exclude=("format",))
+    results = cache.get(cache_key)
+    if results is None:
+        results = suggest(request.query_params.get("q", ""), limit=limit)
+        cache.set(cache_key, results, settings.CATALOGUE_RESPONSE_CACHE_TIMEOUT)
+    return Response({"results": results})
+
+
+@api_view(["GET"])
+@permission_classes([IsVolunteer])
+def scan_code(request, code):
+    """
+    Resolve a scanned item or box code from the scan cache.
+    Returns {"type": "item", "id", "current_location_id", "box_id", "status"}
+    or {"type": "box", "id", "location_id"}.
+    """
+    entry = resolve_code(code)
+    if entry is None:
+        return Response({"detail": "No item or box with this code."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(entry)
+
+
 @api_view(["GET"])
 @permission_classes([IsVolunteer])
 def export_items(request):
     """
-    Export collection items as a CSV file.
+    Export collection items as a streamed CSV file.
     Accepts optional query parameters:
     - start_date (YYYY-MM-DD): filter items created on or after this date
     - end_date (YYYY-MM-DD): filter items created on or before this date
     - box_id (int): filter items belonging to a specific box
     - record_type (str): filter by item_type (SOFTWARE, HARDWARE, NON_ELECTRONIC)
     """
-    queryset = CollectionItem.objects.all().select_related("box", "current_location")
+    try:
+        export_filters = parse_export_filters(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Apply filters
-    start_date = request.query_params.get("start_date")
-    end_date = request.query_params.get("end_date")
-    box_id = request.query_params.get("box_id")
-    record_type = request.query_params.get("record_type")
+    queryset = get_export_queryset(export_filters)
 
-    if start_date:
-        try:
-            parsed = datetime.strptime(start_date, "%Y-%m-%d")
-            queryset = queryset.filter(created_at__date__gte=parsed.date())
-        except ValueError:
-            return Response(
-                {"error": "Invalid start_date format. Use YYYY-MM-DD."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-    if end_date:
-        try:
-            parsed = datetime.strptime(end_date, "%Y-%m-%d")
-            queryset = queryset.filter(created_at__date__lte=parsed.date())
-        except ValueError:
-            return Response(
-                {"error": "Invalid end_date format. Use YYYY-MM-DD."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+    today = datetime.now().strftime("%Y%m%d")
+    response = StreamingHttpResponse(iter_csv(iter_export_rows(queryset)), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="made_export_{today}.csv"'
+    return response
 
-    if box_id:
-        try:
-            box_id_int = int(box_id)
-        except (TypeError, ValueError):
-            return Response(
-                {"error": "Invalid box_id. Must be an integer."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        queryset = queryset.filter(box__id=box_id_int)
 
-    if record_type:
-        queryset = queryset.filter(item_type=record_type)
+class ExportJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Background CSV exports, for exports too large to stream from a web worker.
+    - POST /api/inventory/export-jobs/ - Queue an export (same filters as /export/ in the body)
+    - GET /api/inventory/export-jobs/ - List your export jobs (admins see all)
+    - GET /api/inventory/export-jobs/{id}/ - Poll a job's status
+    - GET /api/inventory/export-jobs/{id}/download/ - Download the finished CSV
+
+    An identical export that is queued, running or finished recently is reused
+    instead of queuing new work (200 instead of 202).
+    """
 
-    # Build CSV response
-    today = datetime.now().strftime("%Y%m%d")
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="made_export_{today}.csv"'
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsVolunteer]
 
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "MADE ID",
-            "Title",
-            "Platform",
-            "Item Type",
-            "Box Code",
-            "Location",
-            "Location Type",
-            "Working Condition",
-            "Status",
-            "Created At",
-        ]
-    )
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.role != "ADMIN":
+            queryset = queryset.filter(requested_by=self.request.user)
+        return queryset
 
-    for item in queryset:
-        writer.writerow(
-            [
-                item.item_code,
-                item.title,
-                item.platform,
-                item.get_item_type_display(),
-                item.box.box_code if item.box else "",
-                item.current_location.name if item.current_location else "",
-                item.current_location.get_location_type_display() if item.current_location else "",
-                "Yes" if item.working_condition else "No",
-                item.get_status_display(),
-                item.created_at.strftime("%Y-%m-%d %H:%M:%S") if item.created_at else "",
-            ]
-        )
+    def create(self, request, *args, **kwargs):
+        try:
+            export_filters = parse_export_filters(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job, created = submit_export_job(export_filters, user=request.user)
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """Download the CSV file of a completed export job."""
+        job = self.get_object()
+        if job.status != "COMPLETED":
+            return Response({"detail": "Export is not ready."}, status=status.HTTP_409_CONFLICT)
+        try:
+            csv_file = open(job.file_path, "rb")
+        except OSError:
+            return Response({"detail": "Export file is no longer available."}, status=status.HTTP_410_GONE)
 
-    return response
+        filename = f"made_export_{job.finished_at.strftime('%Y%m%d')}.csv"
+        return FileResponse(csv_file, as_attachment=True, filename=filename, content_type="text/csv")
@@ -65,26 +65,28 @@ class ItemMovementRequest(models.Model):
         self.item.status = "IN_TRANSIT"
         self.item.save(update_fields=["status", "updated_at"])
 
-        # Create history event for approval
-        ItemHistory.objects.create(
-            item=self.item,
-            event_type="MOVE_APPROVED",
-            from_location=self.from_location,
-            to_location=self.to_location,
-            movement_request=self,
-            acted_by=admin_user,
-            notes=comment,
-        )
-
-        # Create IN_TRANSIT history event
-        ItemHistory.objects.create(
-            item=self.item,
-            event_type="IN_TRANSIT",
-            from_location=self.from_location,
-            to_location=self.to_location,
-            movement_request=self,
-            acted_by=admin_user,
-            notes=f"Item in transit to {self.to_location.name}",
+        # Create the approval and IN_TRANSIT history events together
+        ItemHistory.objects.record_many(
+            [
+                ItemHistory(
+                    item=self.item,
+                    event_type="MOVE_APPROVED",
+                    from_location=self.from_location,
+                    to_location=self.to_location,
+                    movement_request=self,
+                    acted_by=admin_user,
+                    notes=comment,
+                ),
+                ItemHistory(
+                    item=self.item,
+                    event_type="IN_TRANSIT",
+                    from_location=self.from_location,
+                    to_location=self.to_location,
+                    movement_request=self,
+                    acted_by=admin_user,
+                    notes=f"Item in transit to {self.to_location.name}",
+                ),
+            ]
         )
 
     def reject(self, admin_user, comment=""):